@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Bar History - Append-Only Bar Revision Log with Point-in-Time Snapshots
+Records every bar insert/revision with its ingestion time and answers
+"dataset as it was at <time>" queries from compacted snapshots plus deltas
+Version 1.0
+"""
+
+import json
+import logging
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, List, Union
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# ==================== Configuration ====================
+DEFAULT_SNAPSHOT_EVERY = 30  # Ingestions between compacted snapshots
+DEFAULT_QUERY_TIMEZONE = 'Asia/Bangkok'  # Naive as-of times are read in this timezone
+
+BAR_VALUE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+LOG_COLUMNS = ['ingested_at', 'bar_time', 'op'] + BAR_VALUE_COLUMNS
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+INGEST_FORMAT = '%Y-%m-%d %H:%M:%S.%f'  # UTC
+
+LOG_FILE = 'revisions.csv'
+MANIFEST_FILE = 'manifest.json'
+# ========================================================
+
+
+def series_name(symbol: str, exchange: str, interval: str) -> str:
+    """Directory-safe series name, e.g. COMEX_GC1_1D"""
+    return re.sub(r'[^A-Za-z0-9_]+', '', f"{exchange}_{symbol}_{interval}")
+
+
+def _to_utc(when: Union[str, datetime, pd.Timestamp, None], timezone: str) -> pd.Timestamp:
+    """Parse a query/ingestion time to naive UTC (naive input is read in timezone)"""
+    ts = pd.Timestamp.now(tz='UTC') if when is None else pd.Timestamp(when)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize(ZoneInfo(timezone))
+    return ts.tz_convert('UTC').tz_localize(None)
+
+
+class BarRevisionLog:
+    def __init__(self, root: str, snapshot_every: int = DEFAULT_SNAPSHOT_EVERY,
+                 timezone: str = DEFAULT_QUERY_TIMEZONE):
+        """
+        Append-only revision log for one bar series
+
+        Layout of root:
+            revisions.csv          - append-only log of inserts/revisions
+            snapshot_<ts>.csv.gz   - compacted state (latest value per bar)
+            manifest.json          - snapshots with their log byte offsets
+
+        Args:
+            root: Directory for this series (created if missing)
+            snapshot_every: Write a compacted snapshot after this many ingestions
+            timezone: Timezone for naive as-of / ingestion times
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.log_path = self.root / LOG_FILE
+        self.manifest_path = self.root / MANIFEST_FILE
+        self.snapshot_every = max(1, snapshot_every)
+        self.timezone = timezone
+
+    # ---------- Manifest ----------
+
+    def _load_manifest(self) -> Dict:
+        if self.manifest_path.exists():
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {'snapshots': [], 'ingestions_since_snapshot': 0}
+
+    def _save_manifest(self, manifest: Dict):
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        tmp_path.replace(self.manifest_path)
+
+    # ---------- Reading ----------
+
+    def _read_log(self, offset: int = 0) -> pd.DataFrame:
+        """Read log rows starting at a byte offset (0 = whole log)"""
+        if not self.log_path.exists() or self.log_path.stat().st_size <= offset:
+            return pd.DataFrame(columns=LOG_COLUMNS)
+
+        with open(self.log_path, 'rb') as f:
+            f.seek(offset)
+            if offset == 0:
+                log = pd.read_csv(f, float_precision='round_trip')
+            else:
+                log = pd.read_csv(f, header=None, names=LOG_COLUMNS, float_precision='round_trip')
+
+        log['ingested_at'] = pd.to_datetime(log['ingested_at'], format=INGEST_FORMAT)
+        return log
+
+    def _read_snapshot(self, entry: Dict) -> pd.DataFrame:
+        return pd.read_csv(self.root / entry['file'], float_precision='round_trip')
+
+    def _state(self, as_of: Optional[pd.Timestamp]) -> pd.DataFrame:
+        """Latest value per bar from the best snapshot plus log deltas up to as_of"""
+        manifest = self._load_manifest()
+        snapshots = manifest['snapshots']
+        if as_of is not None:
+            snapshots = [s for s in snapshots if pd.Timestamp(s['as_of']) <= as_of]
+
+        if snapshots:
+            base = self._read_snapshot(snapshots[-1])
+            deltas = self._read_log(snapshots[-1]['log_offset'])
+        else:
+            base = pd.DataFrame(columns=['bar_time'] + BAR_VALUE_COLUMNS)
+            deltas = self._read_log(0)
+
+        if as_of is not None and not deltas.empty:
+            # Log is chronological, so a binary search finds the cut-off
+            cut = np.searchsorted(deltas['ingested_at'].to_numpy(), np.datetime64(as_of), side='right')
+            deltas = deltas.iloc[:cut]
+
+        frames = [df for df in (base, deltas[['bar_time'] + BAR_VALUE_COLUMNS]) if not df.empty]
+        if not frames:
+            return pd.DataFrame(columns=['bar_time'] + BAR_VALUE_COLUMNS)
+
+        state = pd.concat(frames, ignore_index=True)
+        state = state.drop_duplicates(subset='bar_time', keep='last')
+        return state.sort_values('bar_time').reset_index(drop=True)
+
+    def as_of(self, when: Union[str, datetime, pd.Timestamp, None] = None) -> Optional[pd.DataFrame]:
+        """
+        Reconstruct the dataset as it was known at a point in time
+
+        Args:
+            when: Query time (naive values use the log timezone); None = latest
+
+        Returns:
+            DataFrame with datetime + OHLCV columns, or None if nothing was known yet
+        """
+        try:
+            as_of = None if when is None else _to_utc(when, self.timezone)
+            state = self._state(as_of)
+            if state.empty:
+                logger.warning(f"No bars recorded in {self.root} as of {when or 'now'}")
+                return None
+
+            state = state.rename(columns={'bar_time': 'datetime'})
+            state['datetime'] = pd.to_datetime(state['datetime'], format=TIME_FORMAT)
+            if state['volume'].isna().all():
+                state = state.drop(columns=['volume'])
+            return state
+
+        except Exception as e:
+            logger.error(f"Error reading bar history from {self.root}: {e}")
+            return None
+
+    def revisions(self, bar_time: Union[str, datetime, pd.Timestamp]) -> pd.DataFrame:
+        """Full revision history of a single bar (audit trail)"""
+        key = pd.Timestamp(bar_time).strftime(TIME_FORMAT)
+        log = self._read_log(0)
+        return log[log['bar_time'] == key].reset_index(drop=True)
+
+    # ---------- Writing ----------
+
+    def _normalize(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Bring fetched bars to log layout: bar_time string key + OHLCV"""
+        df = data.reset_index() if isinstance(data.index, pd.DatetimeIndex) else data.copy()
+        if 'datetime' not in df.columns:
+            raise ValueError("No datetime column or index found")
+
+        bar_time = pd.to_datetime(df['datetime'])
+        if bar_time.dt.tz is not None:
+            bar_time = bar_time.dt.tz_convert('UTC').dt.tz_localize(None)
+
+        bars = pd.DataFrame({'bar_time': bar_time.dt.strftime(TIME_FORMAT)})
+        for col in BAR_VALUE_COLUMNS:
+            bars[col] = df[col].to_numpy(dtype=np.float64) if col in df.columns else np.nan
+        return bars.drop_duplicates(subset='bar_time', keep='last')
+
+    def record(self, data: pd.DataFrame,
+               ingested_at: Union[str, datetime, pd.Timestamp, None] = None) -> int:
+        """
+        Append new and revised bars to the log
+
+        Bars identical to their latest recorded value are skipped, so an
+        unchanged fetch appends nothing.
+
+        Args:
+            data: Fetched bars (datetime index or column + OHLC[V])
+            ingested_at: Ingestion time (default: now)
+
+        Returns:
+            Number of log rows appended, or -1 if failed
+        """
+        if data is None or data.empty:
+            logger.error("No data provided for revision log")
+            return -1
+
+        try:
+            ingest_ts = _to_utc(ingested_at, self.timezone)
+            incoming = self._normalize(data)
+            current = self._state(None).set_index('bar_time')
+
+            merged = incoming.join(current, on='bar_time', rsuffix='_prev')
+            is_new = ~incoming['bar_time'].isin(current.index)
+
+            changed = np.zeros(len(incoming), dtype=bool)
+            for col in BAR_VALUE_COLUMNS:
+                new_vals = merged[col].to_numpy(dtype=np.float64)
+                old_vals = merged[f'{col}_prev'].to_numpy(dtype=np.float64)
+                both_nan = np.isnan(new_vals) & np.isnan(old_vals)
+                changed |= (new_vals != old_vals) & ~both_nan
+
+            delta = incoming[is_new.to_numpy() | changed].copy()
+            if not delta.empty:
+                delta.insert(0, 'op', np.where(delta['bar_time'].isin(current.index), 'revise', 'insert'))
+                delta.insert(0, 'ingested_at', ingest_ts.strftime(INGEST_FORMAT))
+                write_header = not self.log_path.exists() or self.log_path.stat().st_size == 0
+                delta[LOG_COLUMNS].to_csv(self.log_path, mode='a', header=write_header,
+                                          index=False, encoding='utf-8')
+
+            n_revised = int((delta['op'] == 'revise').sum()) if not delta.empty else 0
+            logger.info(f"Bar history {self.root.name}: {len(delta) - n_revised} inserted, "
+                        f"{n_revised} revised")
+
+            manifest = self._load_manifest()
+            manifest['ingestions_since_snapshot'] = manifest.get('ingestions_since_snapshot', 0) + 1
+            self._save_manifest(manifest)
+            if manifest['ingestions_since_snapshot'] >= self.snapshot_every:
+                self.compact(ingest_ts.tz_localize('UTC'))
+
+            return len(delta)
+
+        except Exception as e:
+            logger.error(f"Error recording bar revisions in {self.root}: {e}")
+            return -1
+
+    def compact(self, as_of: Union[str, datetime, pd.Timestamp, None] = None) -> bool:
+        """Write a compacted snapshot of the current state and register it in the manifest"""
+        try:
+            as_of_ts = _to_utc(as_of, self.timezone)
+            log_offset = self.log_path.stat().st_size if self.log_path.exists() else 0
+
+            # A snapshot stamped before an ingestion it contains would leak that
+            # ingestion into earlier as-of queries
+            manifest = self._load_manifest()
+            last_offset = manifest['snapshots'][-1]['log_offset'] if manifest['snapshots'] else 0
+            pending = self._read_log(last_offset)
+            latest = pending['ingested_at'].max() if not pending.empty else None
+            if manifest['snapshots']:
+                last_snapshot = pd.Timestamp(manifest['snapshots'][-1]['as_of'])
+                latest = last_snapshot if latest is None else max(latest, last_snapshot)
+            if latest is not None and latest > as_of_ts:
+                logger.error(f"Snapshot time {as_of_ts} is before the last ingestion {latest} in {self.root}")
+                return False
+
+            state = self._state(None)
+
+            filename = f"snapshot_{as_of_ts.strftime('%Y%m%dT%H%M%S')}.csv.gz"
+            state.to_csv(self.root / filename, index=False, encoding='utf-8')
+
+            manifest['snapshots'].append({
+                'file': filename,
+                'as_of': as_of_ts.strftime(INGEST_FORMAT),
+                'log_offset': log_offset,
+                'bars': len(state)
+            })
+            manifest['ingestions_since_snapshot'] = 0
+            self._save_manifest(manifest)
+
+            logger.info(f"Bar history snapshot saved to {self.root / filename} ({len(state)} bars)")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error writing bar history snapshot in {self.root}: {e}")
+            return False
+
+
+def list_series(history_dir: str) -> List[str]:
+    """Series names recorded under a history directory"""
+    root = Path(history_dir)
+    if not root.exists():
+        return []
+    return sorted(p.name for p in root.iterdir() if (p / MANIFEST_FILE).exists() or (p / LOG_FILE).exists())
+
+
+def main():
+    """Point-in-time query against the bar revision log"""
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='Query the append-only bar revision log')
+    parser.add_argument('--history-dir', type=str, default='history',
+                        help='Bar history directory (default: history)')
+    parser.add_argument('--series', type=str, default=None,
+                        help='Series name, e.g. OANDA_XAUUSD_1D (omit to list series)')
+    parser.add_argument('--as-of', type=str, default=None,
+                        help=f'Point in time, e.g. "2026-03-01 08:00" ({DEFAULT_QUERY_TIMEZONE} if naive)')
+    parser.add_argument('--bar', type=str, default=None,
+                        help='Show the revision history of a single bar instead')
+    parser.add_argument('--output', type=str, default=None,
+                        help='Write the as-of dataset to this CSV file')
+    args = parser.parse_args()
+
+    if not args.series:
+        for name in list_series(args.history_dir):
+            print(name)
+        return
+
+    log = BarRevisionLog(str(Path(args.history_dir) / args.series))
+    if args.bar:
+        print(log.revisions(args.bar).to_string(index=False))
+        return
+
+    data = log.as_of(args.as_of)
+    if data is None:
+        return
+    if args.output:
+        data.to_csv(args.output, index=False, encoding='utf-8')
+        logger.info(f"As-of dataset saved to {args.output} ({len(data)} bars)")
+    else:
+        print(data.tail(10).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Bar Store - Time-Indexed In-Memory Bars with O(log n) Range Views
+Sorted int64 epoch index + column arrays; window queries return zero-copy views
+Version 1.0
+"""
+
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, List, Union
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# ==================== Configuration ====================
+DEFAULT_TIMEZONE = 'Asia/Bangkok'  # Presentation timezone and default for naive query times
+NS_PER_DAY = 86_400 * 10**9
+# ========================================================
+
+TimeLike = Union[str, datetime, pd.Timestamp, np.datetime64, int]
+
+
+class BarView:
+    """Read-only window [lo, hi) over a BarStore; column access returns numpy views"""
+
+    def __init__(self, store: 'BarStore', lo: int, hi: int):
+        self.store = store
+        self.lo = lo
+        self.hi = max(lo, hi)
+
+    def __len__(self) -> int:
+        return self.hi - self.lo
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.store.columns[column][self.lo:self.hi]
+
+    @property
+    def index(self) -> np.ndarray:
+        """Epoch nanoseconds (UTC) of the bars in this window"""
+        return self.store.index[self.lo:self.hi]
+
+    @property
+    def empty(self) -> bool:
+        return self.hi <= self.lo
+
+    def datetimes(self, timezone: str = None) -> pd.DatetimeIndex:
+        """Bar times converted to the presentation timezone (only done here)"""
+        tz = ZoneInfo(timezone) if timezone else self.store.timezone
+        return pd.DatetimeIndex(self.index.view('datetime64[ns]')).tz_localize('UTC').tz_convert(tz)
+
+    def to_frame(self, timezone: str = None) -> pd.DataFrame:
+        """Materialize the window as a DataFrame with a tz-aware datetime column"""
+        df = pd.DataFrame({name: values[self.lo:self.hi] for name, values in self.store.columns.items()})
+        df.insert(0, 'datetime', self.datetimes(timezone))
+        return df
+
+
+class BarStore:
+    def __init__(self, index: np.ndarray, columns: Dict[str, np.ndarray], timezone: str = DEFAULT_TIMEZONE,
+                 source_timezone: str = 'UTC'):
+        """
+        In-memory bar store keyed by a sorted int64 epoch index
+
+        Args:
+            index: Bar times as int64 epoch nanoseconds (UTC), sorted ascending
+            columns: Column name to 1D array, same length as index
+            timezone: Presentation timezone and default for naive query times
+            source_timezone: Timezone the naive source times were read in (reused by append)
+        """
+        self.index = np.ascontiguousarray(index, dtype=np.int64)
+        self.columns = {name: np.ascontiguousarray(values) for name, values in columns.items()}
+        self.timezone = ZoneInfo(timezone)
+        self.source_timezone = source_timezone
+
+    @classmethod
+    def from_frame(cls, data: pd.DataFrame, timezone: str = DEFAULT_TIMEZONE,
+                   source_timezone: str = 'UTC') -> Optional['BarStore']:
+        """
+        Build a store from a DataFrame (datetime index or column); parses times once
+
+        Args:
+            data: Bars with a datetime index or 'datetime' column
+            timezone: Presentation timezone
+            source_timezone: Timezone of naive datetimes (filter_data_by_date treats them as UTC)
+
+        Returns:
+            BarStore or None if failed
+        """
+        if data is None or data.empty:
+            logger.error("No data provided for bar store")
+            return None
+
+        try:
+            df = data.reset_index() if isinstance(data.index, pd.DatetimeIndex) else data
+            if 'datetime' not in df.columns:
+                logger.error("No datetime column or index found")
+                return None
+
+            times = pd.DatetimeIndex(pd.to_datetime(df['datetime']))
+            if times.tz is None:
+                times = times.tz_localize(ZoneInfo(source_timezone))
+            index = times.tz_convert('UTC').as_unit('ns').asi8
+
+            order = np.argsort(index, kind='stable')
+            columns = {col: df[col].to_numpy()[order] for col in df.columns if col != 'datetime'}
+            return cls(index[order], columns, timezone, source_timezone)
+
+        except Exception as e:
+            logger.error(f"Error building bar store: {e}")
+            return None
+
+    @classmethod
+    def from_csv(cls, filename: str, timezone: str = DEFAULT_TIMEZONE,
+                 source_timezone: str = None) -> Optional['BarStore']:
+        """
+        Load a pipeline CSV into a store
+
+        Args:
+            filename: CSV with a datetime column
+            timezone: Presentation timezone
+            source_timezone: Timezone of the CSV times (default: the store timezone,
+                which is right for the date-only daily files; pass 'UTC' for the H1 files)
+        """
+        filepath = Path(filename)
+        if not filepath.exists():
+            logger.error(f"File not found: {filepath}")
+            return None
+        return cls.from_frame(pd.read_csv(filepath), timezone, source_timezone or timezone)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def to_epoch(self, when: TimeLike) -> int:
+        """Query time to epoch nanoseconds; naive times are read in the store timezone"""
+        if isinstance(when, (int, np.integer)):
+            return int(when)
+        ts = pd.Timestamp(when)
+        if ts.tzinfo is None:
+            ts = ts.tz_localize(self.timezone)
+        return int(ts.value)
+
+    # ---------- Window queries (binary search, zero-copy) ----------
+
+    def all(self) -> BarView:
+        return BarView(self, 0, len(self.index))
+
+    def range(self, start: TimeLike = None, end: TimeLike = None) -> BarView:
+        """Bars with start <= time <= end (same bounds as filter_data_by_date)"""
+        lo = 0 if start is None else int(np.searchsorted(self.index, self.to_epoch(start), side='left'))
+        hi = len(self.index) if end is None else int(np.searchsorted(self.index, self.to_epoch(end), side='right'))
+        return BarView(self, lo, hi)
+
+    def last(self, n: int) -> BarView:
+        """Last n bars (filterDataByPeriod in the JS pages counts rows, not days)"""
+        return BarView(self, max(0, len(self.index) - n), len(self.index))
+
+    def last_days(self, days: int, end: TimeLike = None) -> BarView:
+        """Bars in the `days` calendar days ending at `end` (default: last bar)"""
+        if len(self.index) == 0:
+            return BarView(self, 0, 0)
+        hi = len(self.index) if end is None else int(np.searchsorted(self.index, self.to_epoch(end), side='right'))
+        if hi == 0:
+            return BarView(self, 0, 0)
+        lo = int(np.searchsorted(self.index, self.index[hi - 1] - days * NS_PER_DAY, side='right'))
+        return BarView(self, lo, hi)
+
+    def windows(self, days: List[int], end: TimeLike = None) -> Dict[int, BarView]:
+        """Several overlapping lookback windows sharing the same end"""
+        return {d: self.last_days(d, end) for d in days}
+
+    # ---------- Updates ----------
+
+    def append(self, data: pd.DataFrame, source_timezone: str = None) -> int:
+        """
+        Append bars newer than the last stored bar
+
+        Existing views stay valid: appends never move earlier positions.
+        Naive times are read in the store's source timezone unless given, so rows
+        from the file the store was loaded from line up with the loaded bars.
+
+        Returns:
+            Number of bars appended, or -1 if failed
+        """
+        new = BarStore.from_frame(data, str(self.timezone), source_timezone or self.source_timezone)
+        if new is None:
+            return -1
+
+        missing_cols = [col for col in self.columns if col not in new.columns]
+        if missing_cols:
+            logger.error(f"Missing columns for bar store append: {missing_cols}")
+            return -1
+
+        start = 0 if len(self.index) == 0 else int(np.searchsorted(new.index, self.index[-1], side='right'))
+        if start >= len(new.index):
+            return 0
+
+        self.index = np.concatenate([self.index, new.index[start:]])
+        for col in self.columns:
+            self.columns[col] = np.concatenate([self.columns[col], new.columns[col][start:]])
+        return len(new.index) - start
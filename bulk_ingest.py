@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+Bulk Ingest - Local OHLC / Tick Files into the Daily and H1 Pipeline
+Streams large broker exports in bounded-memory blocks, aggregates them to any
+interval in one pass and writes the same CSVs as the TradingView path
+Version 1.0
+"""
+
+import io
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# ==================== Configuration ====================
+DEFAULT_CHUNK_BYTES = 64 * 1024 * 1024  # Bytes parsed at a time per worker
+MAX_PARTIAL_ROWS = 2_000_000  # Raw rows buffered per worker before folding them into bars
+DEFAULT_BUCKET_TIMEZONE = 'UTC'  # Bars are aligned to wall-clock boundaries in this timezone
+
+# Input layouts; headered files map their own column names through COLUMN_ALIASES
+INPUT_FORMATS = {
+    'csv': {'header': True, 'columns': None, 'datetime_format': None},
+    'mt4': {'header': False, 'columns': ['date', 'time', 'open', 'high', 'low', 'close', 'volume'],
+            'datetime_format': '%Y.%m.%d %H:%M'},
+    'tick': {'header': False, 'columns': ['datetime', 'bid', 'ask', 'volume'], 'datetime_format': None},
+    'dukascopy': {'header': True, 'columns': None, 'datetime_format': '%d.%m.%Y %H:%M:%S.%f'}
+}
+
+COLUMN_ALIASES = {
+    'gmt time': 'datetime',
+    'local time': 'datetime',
+    'timestamp': 'datetime',
+    'date_time': 'datetime',
+    'tickvol': 'volume',
+    'vol': 'volume',
+    'last': 'price'
+}
+
+INTERVAL_UNITS = {
+    'm': 60 * 10**9,
+    'h': 3600 * 10**9,
+    'd': 86_400 * 10**9,
+    'w': 7 * 86_400 * 10**9
+}
+WEEK_ANCHOR_NS = 4 * 86_400 * 10**9  # 1970-01-05 was a Monday
+# ========================================================
+
+PARTIAL_FIELDS = ['bucket', 't_first', 't_last', 'open', 'high', 'low', 'close', 'volume']
+
+
+def interval_to_ns(interval: str) -> Tuple[int, int]:
+    """
+    Parse an interval like '15m', '1h', '4h', '1d' or '1w'
+
+    Returns:
+        (bucket size, anchor) in nanoseconds; weekly bars start on Monday
+    """
+    match = re.fullmatch(r'(\d+)\s*([mhdw])', interval.strip().lower())
+    if not match or int(match.group(1)) <= 0:
+        raise ValueError(f"Invalid interval: {interval}")
+    unit = match.group(2)
+    return int(match.group(1)) * INTERVAL_UNITS[unit], WEEK_ANCHOR_NS if unit == 'w' else 0
+
+
+def tradingview_interval_name(interval: str) -> str:
+    """TvDatafeed Interval value for an interval string ('1d' -> '1D', '15m' -> '15')"""
+    match = re.fullmatch(r'(\d+)\s*([mhdw])', interval.strip().lower())
+    if not match:
+        raise ValueError(f"Invalid interval: {interval}")
+    count, unit = match.group(1), match.group(2)
+    return count if unit == 'm' else f"{count}{unit.upper()}"
+
+
+def _normalize_columns(names: List[str]) -> List[str]:
+    normalized = []
+    for name in names:
+        key = str(name).strip().strip('<>').strip().lower()
+        normalized.append(COLUMN_ALIASES.get(key, key))
+    return normalized
+
+
+def read_header(path: str, fmt: str) -> Tuple[List[str], int]:
+    """
+    Column names and the byte offset where data rows start
+
+    Returns:
+        (normalized column names, offset of the first data row)
+    """
+    config = INPUT_FORMATS[fmt]
+    if not config['header']:
+        return list(config['columns']), 0
+
+    with open(path, 'rb') as f:
+        first_line = f.readline()
+    names = first_line.decode('utf-8-sig').strip().split(',')
+    return _normalize_columns(names), len(first_line)
+
+
+def split_ranges(path: str, start: int, n_parts: int) -> List[Tuple[int, int]]:
+    """Split [start, EOF) into byte ranges that begin and end on line boundaries"""
+    size = os.path.getsize(path)
+    if size <= start:
+        return []
+
+    bounds = [start]
+    with open(path, 'rb') as f:
+        for i in range(1, n_parts):
+            target = start + (size - start) * i // n_parts
+            if target <= bounds[-1]:
+                continue
+            f.seek(target)
+            f.readline()  # Move to the start of the next full line
+            offset = f.tell()
+            if bounds[-1] < offset < size:
+                bounds.append(offset)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def iter_blocks(path: str, start: int, end: int, chunk_bytes: int = DEFAULT_CHUNK_BYTES):
+    """Yield raw byte blocks of whole lines from [start, end)"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        position = start
+        while position < end:
+            block = f.read(min(chunk_bytes, end - position))
+            if not block:
+                break
+            position += len(block)
+            if position < end and not block.endswith(b'\n'):
+                tail = f.readline()
+                position += len(tail)
+                block += tail
+            yield block
+
+
+def _parse_times(df: pd.DataFrame, datetime_format: str = None) -> np.ndarray:
+    """Naive wall-clock datetimes (epoch nanoseconds) from a parsed block"""
+    if 'datetime' in df.columns:
+        raw = df['datetime']
+    elif 'date' in df.columns and 'time' in df.columns:
+        raw = df['date'].astype(str) + ' ' + df['time'].astype(str)
+    elif 'time' in df.columns:
+        raw = df['time']
+    else:
+        raise ValueError(f"No datetime column in {list(df.columns)}")
+
+    if pd.api.types.is_numeric_dtype(raw):
+        # Epoch timestamps; pick the unit from the magnitude
+        magnitude = float(np.nanmax(np.abs(raw.to_numpy(float)))) if len(raw) else 0.0
+        unit = 's' if magnitude < 1e11 else 'ms' if magnitude < 1e14 else 'us' if magnitude < 1e17 else 'ns'
+        times = pd.to_datetime(raw, unit=unit)
+    else:
+        times = pd.to_datetime(raw, format=datetime_format)
+    return pd.DatetimeIndex(times).as_unit('ns').asi8
+
+
+def block_to_partials(df: pd.DataFrame, step: int, anchor: int, source_timezone: str,
+                      bucket_timezone: str, price_field: str = 'bid',
+                      datetime_format: str = None) -> Dict[str, np.ndarray]:
+    """
+    Turn one parsed block (bars or ticks) into rows of partial bars
+
+    Every input row is a one-row partial bar: ticks use their price for all
+    of OHLC and count as volume 1 when the file has no volume column.
+
+    Returns:
+        Dictionary of PARTIAL_FIELDS arrays
+    """
+    wall = _parse_times(df, datetime_format)
+
+    if source_timezone == 'UTC' and bucket_timezone == 'UTC':
+        t = wall
+    else:
+        # Repeated wall-clock hours at DST ends are read as the first occurrence
+        utc = pd.DatetimeIndex(wall.view('datetime64[ns]')).tz_localize(
+            source_timezone, ambiguous=np.ones(len(wall), dtype=bool), nonexistent='shift_forward')
+        t = utc.tz_convert('UTC').as_unit('ns').asi8
+        if bucket_timezone != source_timezone:
+            wall = utc.tz_convert(bucket_timezone).tz_localize(None).as_unit('ns').asi8
+
+    has_volume = 'volume' in df.columns and df['volume'].notna().any()
+    if all(col in df.columns for col in ['open', 'high', 'low', 'close']):
+        o, h, l, c = (df[col].to_numpy(float) for col in ['open', 'high', 'low', 'close'])
+        volume = df['volume'].to_numpy(float) if has_volume else np.zeros(len(df))
+    else:
+        if 'price' in df.columns:
+            price = df['price'].to_numpy(float)
+        elif price_field == 'mid':
+            price = (df['bid'].to_numpy(float) + df['ask'].to_numpy(float)) / 2
+        else:
+            price = df[price_field].to_numpy(float)
+        o = h = l = c = price
+        volume = df['volume'].to_numpy(float) if has_volume else np.ones(len(df))
+
+    valid = ~(np.isnan(o) | np.isnan(h) | np.isnan(l) | np.isnan(c))
+    return {
+        'bucket': ((wall - anchor) // step)[valid],
+        't_first': t[valid],
+        't_last': t[valid],
+        'open': o[valid],
+        'high': h[valid],
+        'low': l[valid],
+        'close': c[valid],
+        'volume': np.nan_to_num(volume)[valid]
+    }
+
+
+def reduce_partials(parts: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """
+    Merge partial bars that share a bucket (first open, max high, min low, last close)
+
+    Open and close are chosen by time, not by position, so partials can come
+    from blocks in any order. Ties keep file order.
+    """
+    merged = {field: np.concatenate([part[field] for part in parts]) for field in PARTIAL_FIELDS}
+    if len(merged['bucket']) == 0:
+        return merged
+
+    by_first = np.lexsort((merged['t_first'], merged['bucket']))
+    buckets = merged['bucket'][by_first]
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(buckets)) + 1])
+    ends = np.concatenate([starts[1:], [len(buckets)]]) - 1
+    by_last = np.lexsort((merged['t_last'], merged['bucket']))
+
+    return {
+        'bucket': buckets[starts],
+        't_first': merged['t_first'][by_first][starts],
+        't_last': merged['t_last'][by_last][ends],
+        'open': merged['open'][by_first][starts],
+        'high': np.maximum.reduceat(merged['high'][by_first], starts),
+        'low': np.minimum.reduceat(merged['low'][by_first], starts),
+        'close': merged['close'][by_last][ends],
+        'volume': np.add.reduceat(merged['volume'][by_first], starts)
+    }
+
+
+def _aggregate_range(args: Tuple) -> Dict[str, np.ndarray]:
+    """Worker: parse one byte range block by block and reduce it to partial bars"""
+    (path, start, end, columns, fmt, step, anchor, source_timezone, bucket_timezone,
+     price_field, chunk_bytes) = args
+    datetime_format = INPUT_FORMATS[fmt]['datetime_format']
+
+    done, pending, pending_rows = [], [], 0
+    for block in iter_blocks(path, start, end, chunk_bytes):
+        df = pd.read_csv(io.BytesIO(block), header=None, names=columns,
+                         skipinitialspace=True, skip_blank_lines=True)
+        if df.empty:
+            continue
+        pending.append(block_to_partials(df, step, anchor, source_timezone, bucket_timezone,
+                                         price_field, datetime_format))
+        pending_rows += len(pending[-1]['bucket'])
+
+        # Raw rows are folded into bars as they arrive, so memory tracks the output size
+        if pending_rows >= MAX_PARTIAL_ROWS:
+            done.append(reduce_partials(pending))
+            pending, pending_rows = [], 0
+
+    if pending:
+        done.append(reduce_partials(pending))
+    if not done:
+        return {field: np.array([], dtype=np.int64 if field in PARTIAL_FIELDS[:3] else float)
+                for field in PARTIAL_FIELDS}
+    return reduce_partials(done)
+
+
+def aggregate_file(path: str, interval: str = '1d', fmt: str = 'csv', source_timezone: str = 'UTC',
+                   bucket_timezone: str = DEFAULT_BUCKET_TIMEZONE, price_field: str = 'bid',
+                   symbol: str = None, max_workers: int = None,
+                   chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> Optional[pd.DataFrame]:
+    """
+    Aggregate a local OHLC or tick file into bars in a single pass
+
+    The file is split into line-aligned byte ranges, one per worker process.
+    Each worker streams its range in chunk_bytes blocks and keeps only partial
+    bars, so memory depends on the number of output bars, not the file size.
+
+    Args:
+        path: CSV file (bars or ticks)
+        interval: Output interval ('1m', '15m', '1h', '4h', '1d', '1w', ...)
+        fmt: Key from INPUT_FORMATS
+        source_timezone: Timezone of the timestamps in the file
+        bucket_timezone: Timezone whose wall clock defines bar boundaries and labels
+        price_field: Tick price to use when the file has bid/ask ('bid', 'ask' or 'mid')
+        symbol: Value for the symbol column (e.g. 'OANDA:XAUUSD')
+        max_workers: Worker processes (default: CPU count)
+        chunk_bytes: Bytes parsed at a time per worker
+
+    Returns:
+        DataFrame shaped like TvDatafeed.get_hist (naive datetime index in
+        bucket_timezone, symbol, open, high, low, close, volume) or None if failed
+    """
+    if fmt not in INPUT_FORMATS:
+        logger.error(f"Unknown input format: {fmt}. Available: {list(INPUT_FORMATS.keys())}")
+        return None
+
+    filepath = Path(path)
+    if not filepath.exists():
+        logger.error(f"File not found: {filepath}")
+        return None
+
+    try:
+        step, anchor = interval_to_ns(interval)
+        columns, data_start = read_header(str(filepath), fmt)
+        max_workers = max_workers or os.cpu_count() or 1
+        ranges = split_ranges(str(filepath), data_start, max_workers)
+        if not ranges:
+            logger.error(f"No data rows in {filepath}")
+            return None
+
+        size_mb = os.path.getsize(filepath) / 1024 / 1024
+        logger.info(f"Aggregating {filepath} ({size_mb:.1f} MB) to {interval} bars "
+                    f"with {len(ranges)} worker(s)...")
+
+        jobs = [(str(filepath), start, end, columns, fmt, step, anchor, source_timezone,
+                 bucket_timezone, price_field, chunk_bytes) for start, end in ranges]
+        if len(jobs) == 1:
+            parts = [_aggregate_range(jobs[0])]
+        else:
+            with ProcessPoolExecutor(max_workers=len(jobs)) as executor:
+                parts = list(executor.map(_aggregate_range, jobs))
+
+        bars = reduce_partials(parts)
+        if len(bars['bucket']) == 0:
+            logger.error(f"No valid rows parsed from {filepath}")
+            return None
+
+        index = pd.DatetimeIndex((bars['bucket'] * step + anchor).view('datetime64[ns]'), name='datetime')
+        data = pd.DataFrame({
+            'open': bars['open'],
+            'high': bars['high'],
+            'low': bars['low'],
+            'close': bars['close'],
+            'volume': bars['volume']
+        }, index=index)
+        if symbol:
+            data.insert(0, 'symbol', symbol)
+
+        logger.info(f"Aggregated {len(data)} {interval} bars ({data.index[0]} to {data.index[-1]})")
+        return data
+
+    except Exception as e:
+        logger.error(f"Error aggregating {filepath}: {e}")
+        return None
+
+
+def ingest_file(fetcher, path: str, symbol_key: str, interval: str = '1d', fmt: str = 'csv',
+                output_dir: str = None, output_file: str = None, start_date: str = None,
+                end_date: str = None, **aggregate_kwargs) -> Optional[pd.DataFrame]:
+    """
+    Aggregate a local file and write it where the TradingView path would
+
+    Daily bars go through calculate_indicators, filter_data_by_date and
+    save_to_csv into the symbol's 10-year CSV. Hourly bars are saved like
+    fetch_h1_data_for_basis. Other intervals need an explicit output_file.
+
+    Args:
+        fetcher: TradingView10YearsFetcher instance (no connection needed)
+        path: Local CSV file
+        symbol_key: Key from SYMBOLS ('xauusd', 'gc1')
+        interval: Output interval
+        fmt: Key from INPUT_FORMATS
+        output_dir: Directory to save output files
+        output_file: Output CSV for intervals other than 1d / 1h
+        start_date: Start date for filtering daily bars (YYYY-MM-DD)
+        end_date: End date for filtering daily bars (YYYY-MM-DD)
+        **aggregate_kwargs: Passed to aggregate_file
+
+    Returns:
+        Saved DataFrame or None if failed
+    """
+    from tradingview_10years import SYMBOLS, SYMBOLS_H1, save_h1_data
+
+    if symbol_key not in SYMBOLS:
+        logger.error(f"Unknown symbol key: {symbol_key}. Available: {list(SYMBOLS.keys())}")
+        return None
+
+    config = SYMBOLS[symbol_key]
+    bars = aggregate_file(path, interval=interval, fmt=fmt,
+                          symbol=f"{config['exchange']}:{config['symbol']}", **aggregate_kwargs)
+    if bars is None or not fetcher._validate_ohlcv_data(bars):
+        return None
+
+    # Same series name as the TradingView path (Interval.value), so revisions share one log
+    fetcher._record_bar_history(bars, config['symbol'], config['exchange'], tradingview_interval_name(interval))
+    step, _ = interval_to_ns(interval)
+
+    if step == INTERVAL_UNITS['d']:
+        data = fetcher.calculate_indicators(bars)
+        if data is None:
+            return None
+        data = fetcher.filter_data_by_date(data, start_date, end_date)
+        if data is None:
+            return None
+        target = str(Path(output_dir) / config['output_file']) if output_dir else config['output_file']
+        return data if fetcher.save_to_csv(data, target) else None
+
+    h1_key = f'{symbol_key}_h1'
+    if step == INTERVAL_UNITS['h'] and h1_key in SYMBOLS_H1 and output_file is None:
+        return save_h1_data(bars, h1_key, output_dir)
+
+    if output_file is None:
+        logger.error(f"No pipeline output for {interval} bars; pass output_file")
+        return None
+
+    try:
+        df = bars.reset_index()
+        df['datetime'] = df['datetime'].dt.strftime('%Y-%m-%d %H:%M:%S')
+        filepath = Path(output_dir) / output_file if output_dir else Path(output_file)
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(filepath, index=False, encoding='utf-8')
+        logger.info(f"Saved {len(df)} {interval} bars to {filepath}")
+        return df
+    except Exception as e:
+        logger.error(f"Error saving {interval} bars: {e}")
+        return None
+
+
+def main():
+    """Ingest a local OHLC or tick export into the pipeline outputs"""
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='Aggregate large local OHLC/tick files into pipeline CSVs')
+    parser.add_argument('file', type=str, help='Local CSV export (bars or ticks)')
+    parser.add_argument('--symbol', choices=['xauusd', 'gc1'], required=True,
+                        help='Symbol the file belongs to')
+    parser.add_argument('--interval', type=str, default='1d',
+                        help='Output interval, e.g. 15m, 1h, 4h, 1d, 1w (default: 1d)')
+    parser.add_argument('--format', choices=list(INPUT_FORMATS.keys()), default='csv',
+                        help='Input layout (default: csv with header)')
+    parser.add_argument('--source-tz', type=str, default='UTC',
+                        help='Timezone of the timestamps in the file (default: UTC)')
+    parser.add_argument('--bucket-tz', type=str, default=DEFAULT_BUCKET_TIMEZONE,
+                        help='Timezone whose wall clock defines bar boundaries (default: UTC)')
+    parser.add_argument('--price', choices=['bid', 'ask', 'mid'], default='bid',
+                        help='Tick price when the file has bid/ask columns (default: bid)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Parser processes (default: CPU count)')
+    parser.add_argument('--chunk-mb', type=int, default=DEFAULT_CHUNK_BYTES // (1024 * 1024),
+                        help='Megabytes parsed at a time per worker')
+    parser.add_argument('--output-dir', type=str, default=None,
+                        help='Output directory for CSV files')
+    parser.add_argument('--output-file', type=str, default=None,
+                        help='Output CSV for intervals other than 1d / 1h')
+    parser.add_argument('--history-dir', type=str, default=None,
+                        help='Also record the bars in the append-only revision log')
+    args = parser.parse_args()
+
+    from tradingview_10years import TradingView10YearsFetcher
+
+    fetcher = TradingView10YearsFetcher(history_dir=args.history_dir)
+    result = ingest_file(
+        fetcher, args.file, args.symbol,
+        interval=args.interval,
+        fmt=args.format,
+        output_dir=args.output_dir,
+        output_file=args.output_file,
+        source_timezone=args.source_tz,
+        bucket_timezone=args.bucket_tz,
+        price_field=args.price,
+        max_workers=args.workers,
+        chunk_bytes=args.chunk_mb * 1024 * 1024
+    )
+    if result is None:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
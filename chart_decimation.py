@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Chart Decimation - Multi-Resolution OHLC Series for Long Histories
+OHLC-aware min/max buckets, one level per zoom step
+Version 1.0
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Optional, Dict, List
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# ==================== Configuration ====================
+LEVEL_FACTOR = 4  # Bucket size grows 4, 16, 64, ... bars per candle
+MIN_LEVEL_POINTS = 20  # Coarsest level must fit the smallest widget (renderMiniCandleChart: 20 candles)
+PRICE_DECIMALS = 4
+
+CHART_INPUTS = {
+    'xauusd': {'input_file': 'xauusd_10years_data.csv', 'output_file': 'xauusd_10years_chart.json', 'interval': '1D'},
+    'gc1': {'input_file': 'gc1_10years_data.csv', 'output_file': 'gc1_10years_chart.json', 'interval': '1D'},
+    'xauusd_h1': {'input_file': 'xauusd_h1_data.csv', 'output_file': 'xauusd_h1_chart.json', 'interval': '1H'},
+    'gc1_h1': {'input_file': 'gc1_h1_data.csv', 'output_file': 'gc1_h1_chart.json', 'interval': '1H'}
+}
+# ========================================================
+
+
+def minmax_buckets(data: pd.DataFrame, bucket: int) -> pd.DataFrame:
+    """
+    Aggregate consecutive bars into OHLC buckets (first open, max high, min low, last close)
+
+    Buckets are anchored at the first bar, so appending bars only changes the
+    last bucket of each level.
+
+    Args:
+        data: DataFrame with datetime, open, high, low, close (and optional volume)
+        bucket: Bars per bucket
+
+    Returns:
+        DataFrame with one row per bucket
+    """
+    n = len(data)
+    starts = np.arange(0, n, bucket)
+    ends = np.minimum(starts + bucket, n) - 1
+
+    out = pd.DataFrame({
+        'datetime': data['datetime'].to_numpy()[starts],
+        'open': data['open'].to_numpy(float)[starts],
+        'high': np.maximum.reduceat(data['high'].to_numpy(float), starts),
+        'low': np.minimum.reduceat(data['low'].to_numpy(float), starts),
+        'close': data['close'].to_numpy(float)[ends]
+    })
+    if 'volume' in data.columns:
+        out['volume'] = np.add.reduceat(data['volume'].fillna(0).to_numpy(float), starts)
+    return out
+
+
+def build_levels(data: pd.DataFrame, factor: int = LEVEL_FACTOR,
+                 min_points: int = MIN_LEVEL_POINTS) -> List[Dict]:
+    """
+    Build the resolution pyramid for one series
+
+    The first level uses buckets of `factor` bars and each next level is
+    `factor` times coarser, until a level has at most min_points candles, so
+    every range fits the smallest widget. Raw bars are not repeated here;
+    they are already in the CSV.
+
+    Returns:
+        List of level dictionaries with columnar arrays
+    """
+    levels = []
+    bucket = factor
+    while len(data) // bucket >= 1:
+        candles = minmax_buckets(data, bucket)
+        level = {
+            'bucket': bucket,
+            'bars': int(len(candles)),
+            'datetime': candles['datetime'].astype(str).tolist()
+        }
+        for col in ['open', 'high', 'low', 'close', 'volume']:
+            if col in candles.columns:
+                level[col] = np.round(candles[col].to_numpy(float), PRICE_DECIMALS).tolist()
+        levels.append(level)
+
+        if len(candles) <= min_points:
+            break
+        bucket *= factor
+
+    return levels
+
+
+def select_level(levels: List[Dict], visible_bars: int, max_points: int) -> Optional[Dict]:
+    """
+    Pick the level to draw for a zoom range (same rule as selectChartLevel in shared.js)
+
+    Returns None when the raw bars already fit in max_points, otherwise the
+    finest level whose candle count fits (or the coarsest level).
+    """
+    if visible_bars <= max_points or not levels:
+        return None
+    for level in levels:
+        if -(-visible_bars // level['bucket']) <= max_points:
+            return level
+    return levels[-1]
+
+
+def export_chart_levels(output_dir: str = None, series: List[str] = None) -> Dict[str, List[Dict]]:
+    """
+    Build and save chart-ready levels for every configured series
+
+    Args:
+        output_dir: Directory containing the pipeline CSVs (default: current directory)
+        series: Keys from CHART_INPUTS (default: all)
+
+    Returns:
+        Dictionary mapping series keys to their levels
+    """
+    if series is None:
+        series = list(CHART_INPUTS.keys())
+
+    base_dir = Path(output_dir) if output_dir else Path('.')
+    results = {}
+
+    for key in series:
+        if key not in CHART_INPUTS:
+            logger.error(f"Unknown series key: {key}. Available: {list(CHART_INPUTS.keys())}")
+            continue
+
+        config = CHART_INPUTS[key]
+        input_file = base_dir / config['input_file']
+        output_file = base_dir / config['output_file']
+        if not input_file.exists():
+            logger.warning(f"Input file not found: {input_file}")
+            continue
+
+        try:
+            data = pd.read_csv(input_file)
+            missing_cols = [col for col in ['datetime', 'open', 'high', 'low', 'close'] if col not in data.columns]
+            if missing_cols:
+                logger.error(f"Missing required columns in {input_file}: {missing_cols}")
+                continue
+
+            levels = build_levels(data)
+            payload = {
+                'series': key,
+                'interval': config['interval'],
+                'totalBars': int(len(data)),
+                'levels': levels
+            }
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, separators=(',', ':'))
+
+            logger.info(f"Chart levels saved to {output_file} "
+                        f"(buckets: {', '.join(str(level['bucket']) for level in levels)})")
+            results[key] = levels
+
+        except Exception as e:
+            logger.error(f"Error building chart levels for {key}: {e}")
+
+    return results
+
+
+def main():
+    """Build multi-resolution chart series from existing pipeline CSVs"""
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='Downsample long histories into chart-ready levels')
+    parser.add_argument('--series', nargs='+', choices=list(CHART_INPUTS.keys()) + ['all'],
+                        default=['all'], help='Series to process (default: all)')
+    parser.add_argument('--output-dir', type=str, default=None,
+                        help='Directory containing the CSV files')
+    args = parser.parse_args()
+
+    series = list(CHART_INPUTS.keys()) if 'all' in args.series else args.series
+    export_chart_levels(output_dir=args.output_dir, series=series)
+
+
+if __name__ == "__main__":
+    main()
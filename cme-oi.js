@@ -165,6 +165,29 @@ async function loadBasisDataFromCSV() {
     }
 }
 
+// Volume-at-price profile on the strike grid (gc1_volume_profile.json from volume_profile.py)
+let volumeProfile = null;
+
+async function loadVolumeProfile() {
+    try {
+        const response = await fetch('gc1_volume_profile.json');
+        if (response.ok) {
+            volumeProfile = await response.json();
+            console.log('Volume profile loaded, as of:', volumeProfile.asOf);
+        }
+    } catch (error) {
+        console.log('No volume profile JSON file found');
+    }
+    return volumeProfile;
+}
+
+// High-volume node at a strike in a profile window (day / week / month), or null
+function getVolumeNode(strike, windowName = 'week') {
+    if (!volumeProfile || !volumeProfile.windows || !volumeProfile.windows[windowName]) return null;
+    const nodes = volumeProfile.windows[windowName].nodes || [];
+    return nodes.find(node => Math.abs(node.price - strike) < volumeProfile.step / 2) || null;
+}
+
 // Generate GC strike grid (00/25/50/75 levels)
 // Range: around current price ±200
 function generateGCStrikeGrid(centerPrice, range = 200) {
@@ -260,6 +283,13 @@ function populateBasisTable(range = currentRange) {
             note = '<span style="color: var(--primary);">Major Level</span>';
         }
 
+        // High-volume node from the weekly H1 volume profile
+        const volumeNode = getVolumeNode(gcStrike);
+        if (volumeNode) {
+            const isPoc = volumeProfile.windows.week.poc === volumeNode.price;
+            note += ` <span style="color: var(--warning);">${isPoc ? 'POC' : 'HVN'} ${(volumeNode.share * 100).toFixed(1)}%</span>`;
+        }
+
         // Zone type badge
         const zoneClass = getZoneClass(gcStrike);
         const zoneLabel = getZoneLabel(gcStrike);
@@ -595,7 +625,7 @@ document.addEventListener('DOMContentLoaded', async () => {
     initRangeSelector();   // Initialize range dropdown
 
     // Load real data from CSV files
-    await loadBasisDataFromCSV();
+    await Promise.all([loadBasisDataFromCSV(), loadVolumeProfile()]);
     populateBasisTable();  // Initialize basis grid table with real data
 });
 
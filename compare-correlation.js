@@ -3,6 +3,7 @@
 
 let xauusdData = [];
 let gc1Data = [];
+let comparison = null; // Precomputed summary + rolling series; null = compute in the browser
 
 document.addEventListener('DOMContentLoaded', async () => {
     initSidebar();
@@ -15,6 +16,7 @@ document.addEventListener('DOMContentLoaded', async () => {
         gc1Data = allData.gc1 || [];
 
         if (xauusdData.length > 0 && gc1Data.length > 0) {
+            comparison = await loadComparisonExports(xauusdData, gc1Data);
             renderCorrelationAnalysis();
         } else {
             showError();
@@ -47,7 +49,7 @@ function renderCorrelationAnalysis() {
 }
 
 function renderCorrelationCards() {
-    const stats = getComparisonStats(xauusdData, gc1Data);
+    const stats = comparison ? comparison.summary : getComparisonStats(xauusdData, gc1Data);
 
     // Price Correlation
     const priceCorr = stats.priceCorr;
@@ -97,23 +99,29 @@ function renderAgreementChart() {
     const ctx = document.getElementById('agreementChart');
     if (!ctx) return;
 
-    const { aligned1, aligned2, dates } = alignDataByDate(xauusdData, gc1Data);
-
-    // Group by day of week (1=Monday, 2=Tuesday, ..., 5=Friday)
     const days = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday'];
-    const agreement = { 1: { match: 0, total: 0 }, 2: { match: 0, total: 0 }, 3: { match: 0, total: 0 }, 4: { match: 0, total: 0 }, 5: { match: 0, total: 0 } };
-
-    for (let i = 0; i < aligned1.length; i++) {
-        const dow = getDayOfWeek(dates[i]); // 0=Sunday, 1=Monday, ..., 6=Saturday
-        if (dow >= 1 && dow <= 5) {
-            agreement[dow].total++;
-            if (isBullish(aligned1[i].candle_type) === isBullish(aligned2[i].candle_type)) {
-                agreement[dow].match++;
+    let agreementPcts;
+
+    if (comparison) {
+        agreementPcts = comparison.summary.directionMatchByDow;
+    } else {
+        const { aligned1, aligned2, dates } = alignDataByDate(xauusdData, gc1Data);
+
+        // Group by day of week (1=Monday, 2=Tuesday, ..., 5=Friday)
+        const agreement = { 1: { match: 0, total: 0 }, 2: { match: 0, total: 0 }, 3: { match: 0, total: 0 }, 4: { match: 0, total: 0 }, 5: { match: 0, total: 0 } };
+
+        for (let i = 0; i < aligned1.length; i++) {
+            const dow = getDayOfWeek(dates[i]); // 0=Sunday, 1=Monday, ..., 6=Saturday
+            if (dow >= 1 && dow <= 5) {
+                agreement[dow].total++;
+                if (isBullish(aligned1[i].candle_type) === isBullish(aligned2[i].candle_type)) {
+                    agreement[dow].match++;
+                }
             }
         }
-    }
 
-    const agreementPcts = days.map((_, i) => agreement[i + 1].total > 0 ? (agreement[i + 1].match / agreement[i + 1].total * 100) : 0);
+        agreementPcts = days.map((_, i) => agreement[i + 1].total > 0 ? (agreement[i + 1].match / agreement[i + 1].total * 100) : 0);
+    }
 
     // Find best and worst
     let bestDay = 0, worstDay = 0;
@@ -171,14 +179,17 @@ function renderScatterChart() {
     const ctx = document.getElementById('scatterChart');
     if (!ctx) return;
 
-    const { aligned1, aligned2 } = alignDataByDate(xauusdData, gc1Data);
-
     // Calculate daily changes
     const scatterData = [];
-    for (let i = 0; i < aligned1.length; i++) {
-        const xChange = aligned1[i].close - aligned1[i].open;
-        const gChange = aligned2[i].close - aligned2[i].open;
-        scatterData.push({ x: xChange, y: gChange });
+    if (comparison) {
+        comparison.rolling.forEach(row => scatterData.push({ x: row.xauusd_change, y: row.gc1_change }));
+    } else {
+        const { aligned1, aligned2 } = alignDataByDate(xauusdData, gc1Data);
+        for (let i = 0; i < aligned1.length; i++) {
+            const xChange = aligned1[i].close - aligned1[i].open;
+            const gChange = aligned2[i].close - aligned2[i].open;
+            scatterData.push({ x: xChange, y: gChange });
+        }
     }
 
     if (charts.scatter) charts.scatter.destroy();
@@ -219,22 +230,29 @@ function renderScatterChart() {
         }
     });
 
+    let corr, beta;
+    if (comparison) {
+        corr = comparison.summary.changeCorr;
+        beta = comparison.summary.changeBeta;
+    } else {
+        const xChanges = scatterData.map(d => d.x);
+        const yChanges = scatterData.map(d => d.y);
+        corr = calculateCorrelation(xChanges, yChanges);
+
+        // Calculate beta (slope)
+        const xMean = xChanges.reduce((a, b) => a + b, 0) / xChanges.length;
+        const yMean = yChanges.reduce((a, b) => a + b, 0) / yChanges.length;
+        let numerator = 0, denominator = 0;
+        for (let i = 0; i < xChanges.length; i++) {
+            numerator += (xChanges[i] - xMean) * (yChanges[i] - yMean);
+            denominator += (xChanges[i] - xMean) ** 2;
+        }
+        beta = denominator !== 0 ? numerator / denominator : 0;
+    }
+
     // Calculate R-squared
-    const xChanges = scatterData.map(d => d.x);
-    const yChanges = scatterData.map(d => d.y);
-    const corr = calculateCorrelation(xChanges, yChanges);
     const rSquared = corr * corr;
 
-    // Calculate beta (slope)
-    const xMean = xChanges.reduce((a, b) => a + b, 0) / xChanges.length;
-    const yMean = yChanges.reduce((a, b) => a + b, 0) / yChanges.length;
-    let numerator = 0, denominator = 0;
-    for (let i = 0; i < xChanges.length; i++) {
-        numerator += (xChanges[i] - xMean) * (yChanges[i] - yMean);
-        denominator += (xChanges[i] - xMean) ** 2;
-    }
-    const beta = denominator !== 0 ? numerator / denominator : 0;
-
     document.getElementById('scatterInsight').innerHTML = `
         R&sup2; = <strong>${rSquared.toFixed(3)}</strong> |
         When XAUUSD changes by $10, GC1! typically changes by <strong>$${(beta * 10).toFixed(2)}</strong> (β = ${beta.toFixed(3)}).
@@ -243,25 +261,45 @@ function renderScatterChart() {
 }
 
 function renderDivergenceTable() {
-    const { aligned1, aligned2, dates } = alignDataByDate(xauusdData, gc1Data);
-
-    // Get last 30 days of divergences
-    const recentDays = Math.min(30, aligned1.length);
     const divergences = [];
+    let totalDivergenceDays, commonDays;
 
-    for (let i = aligned1.length - recentDays; i < aligned1.length; i++) {
-        const bull1 = isBullish(aligned1[i].candle_type);
-        const bull2 = isBullish(aligned2[i].candle_type);
-
-        if (bull1 !== bull2) {
+    if (comparison) {
+        // Last 30 common days, already filtered to direction divergences
+        comparison.summary.recentDivergences.forEach(d => {
             divergences.push({
-                date: dates[i],
-                xauusd: CANDLE_TYPES[aligned1[i].candle_type],
-                gc1: CANDLE_TYPES[aligned2[i].candle_type],
-                xauusdBullish: bull1,
-                gc1Bullish: bull2
+                date: d.date,
+                xauusd: CANDLE_TYPES[d.xauusdType],
+                gc1: CANDLE_TYPES[d.gc1Type],
+                xauusdBullish: isBullish(d.xauusdType),
+                gc1Bullish: isBullish(d.gc1Type)
             });
+        });
+        totalDivergenceDays = comparison.summary.divergenceDays;
+        commonDays = comparison.summary.totalDays;
+    } else {
+        const { aligned1, aligned2, dates } = alignDataByDate(xauusdData, gc1Data);
+
+        // Get last 30 days of divergences
+        const recentDays = Math.min(30, aligned1.length);
+
+        for (let i = aligned1.length - recentDays; i < aligned1.length; i++) {
+            const bull1 = isBullish(aligned1[i].candle_type);
+            const bull2 = isBullish(aligned2[i].candle_type);
+
+            if (bull1 !== bull2) {
+                divergences.push({
+                    date: dates[i],
+                    xauusd: CANDLE_TYPES[aligned1[i].candle_type],
+                    gc1: CANDLE_TYPES[aligned2[i].candle_type],
+                    xauusdBullish: bull1,
+                    gc1Bullish: bull2
+                });
+            }
         }
+
+        totalDivergenceDays = findDivergences(xauusdData, gc1Data).length;
+        commonDays = aligned1.length;
     }
 
     const tbody = document.getElementById('divergenceTableBody');
@@ -281,12 +319,11 @@ function renderDivergenceTable() {
     }
 
     // Total divergence stats
-    const totalDivergences = findDivergences(xauusdData, gc1Data);
-    const divergenceRate = (totalDivergences.length / aligned1.length * 100).toFixed(1);
+    const divergenceRate = (totalDivergenceDays / commonDays * 100).toFixed(1);
 
     document.getElementById('divergenceInsight').innerHTML = `
         Found <strong>${divergences.length}</strong> divergence events in the last 30 days.
-        Overall divergence rate is <strong>${divergenceRate}%</strong> (~${totalDivergences.length} days out of ${aligned1.length} common trading days).
+        Overall divergence rate is <strong>${divergenceRate}%</strong> (~${totalDivergenceDays} days out of ${commonDays} common trading days).
     `;
 }
 
@@ -294,7 +331,9 @@ function renderBasisChart() {
     const ctx = document.getElementById('basisChart');
     if (!ctx) return;
 
-    const basisData = calculateBasis(xauusdData, gc1Data);
+    const basisData = comparison
+        ? comparison.rolling.map(row => ({ date: row.date, basis: row.basis }))
+        : calculateBasis(xauusdData, gc1Data);
 
     // Get last 90 days
     const recent = basisData.slice(-90);
@@ -3,6 +3,7 @@
 
 let xauusdData = [];
 let gc1Data = [];
+let comparison = null; // Precomputed summary + rolling series; null = compute in the browser
 
 document.addEventListener('DOMContentLoaded', async () => {
     initSidebar();
@@ -15,6 +16,7 @@ document.addEventListener('DOMContentLoaded', async () => {
         gc1Data = allData.gc1 || [];
 
         if (xauusdData.length > 0 && gc1Data.length > 0) {
+            comparison = await loadComparisonExports(xauusdData, gc1Data);
             renderComparison();
         } else {
             showError();
@@ -136,7 +138,7 @@ function drawCandle(svgId, data, bullish) {
 }
 
 function renderStatsTable() {
-    const stats = getComparisonStats(xauusdData, gc1Data);
+    const stats = comparison ? comparison.summary : getComparisonStats(xauusdData, gc1Data);
     const tbody = document.getElementById('statsTableBody');
 
     const metrics = [
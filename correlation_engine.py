@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Correlation Engine - Rolling XAUUSD / GC1! Daily Correlation & Divergences
+Aligns both 10-year daily datasets once and exports rolling series for
+compare-correlation.html / compare-side-by-side.html
+Version 1.0
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Optional, Dict, List
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# ==================== Configuration ====================
+ROLLING_WINDOWS = [20, 60, 120, 250]  # Trading days
+DIVERGENCE_WINDOW = 60  # Lookback for normalizing the change spread
+TOP_DIVERGENCES = 50
+VALUE_DECIMALS = 4
+RECENT_DIVERGENCE_DAYS = 30  # Divergence table on compare-correlation.html
+
+COMPARISON_FILES = {
+    'xauusd': 'xauusd_10years_data.csv',
+    'gc1': 'gc1_10years_data.csv',
+    'rolling': 'comparison_rolling.csv',
+    'summary': 'comparison_stats.json'
+}
+# ========================================================
+
+
+def align_by_date(data1: pd.DataFrame, data2: pd.DataFrame) -> pd.DataFrame:
+    """
+    Inner-join two daily datasets on date (alignDataByDate in shared.js)
+
+    Returns:
+        DataFrame indexed by date with <col>_1 / <col>_2 columns, sorted by date
+    """
+    columns = ['datetime', 'open', 'high', 'low', 'close', 'body_size', 'candle_type']
+    left = data1[columns].dropna(subset=['datetime']).drop_duplicates('datetime', keep='last')
+    right = data2[columns].dropna(subset=['datetime']).drop_duplicates('datetime', keep='last')
+
+    aligned = left.merge(right, on='datetime', suffixes=('_1', '_2'), how='inner')
+    aligned['datetime'] = pd.to_datetime(aligned['datetime']).dt.strftime('%Y-%m-%d')
+    return aligned.sort_values('datetime').set_index('datetime')
+
+
+def _pearson(x: np.ndarray, y: np.ndarray) -> float:
+    """Whole-sample Pearson correlation (calculateCorrelation in shared.js: 0 if undefined)"""
+    if len(x) == 0:
+        return 0.0
+    dx = x - x.mean()
+    dy = y - y.mean()
+    denominator = np.sqrt((dx * dx).sum()) * np.sqrt((dy * dy).sum())
+    return float((dx * dy).sum() / denominator) if denominator != 0 else 0.0
+
+
+def _rolling_sum(x: np.ndarray, window: int) -> np.ndarray:
+    out = np.full(len(x), np.nan)
+    if len(x) >= window:
+        csum = np.concatenate([[0.0], np.cumsum(x)])
+        out[window - 1:] = csum[window:] - csum[:-window]
+    return out
+
+
+def rolling_corr(x: np.ndarray, y: np.ndarray, window: int) -> np.ndarray:
+    """Rolling Pearson correlation from cumulative sums (one pass, all windows ending at t)"""
+    # Correlation is shift-invariant; centering keeps the cumulative sums well conditioned
+    x = x - x.mean()
+    y = y - y.mean()
+
+    sx, sy = _rolling_sum(x, window), _rolling_sum(y, window)
+    sxx, syy, sxy = _rolling_sum(x * x, window), _rolling_sum(y * y, window), _rolling_sum(x * y, window)
+
+    cov = sxy - sx * sy / window
+    var_x = sxx - sx * sx / window
+    var_y = syy - sy * sy / window
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = cov / np.sqrt(var_x * var_y)
+    return np.clip(corr, -1.0, 1.0)
+
+
+def rolling_mean(x: np.ndarray, window: int) -> np.ndarray:
+    return _rolling_sum(x.astype(np.float64), window) / window
+
+
+def rolling_std(x: np.ndarray, window: int) -> np.ndarray:
+    mean = rolling_mean(x, window)
+    var = rolling_mean(x * x, window) - mean * mean
+    return np.sqrt(np.maximum(var, 0.0))
+
+
+def rolling_columns(windows: List[int]) -> List[str]:
+    """Column layout of the rolling series export"""
+    columns = ['xauusd_close', 'gc1_close', 'basis', 'xauusd_change', 'gc1_change']
+    for window in windows:
+        columns += [f'corr_close_{window}', f'corr_change_{window}',
+                    f'dir_match_{window}', f'type_match_{window}']
+    return columns + ['divergence_score', 'direction_diverged']
+
+
+def compute_rolling_series(aligned: pd.DataFrame, windows: List[int] = None) -> pd.DataFrame:
+    """
+    Rolling correlation, agreement and divergence series for every aligned date
+
+    Args:
+        aligned: Output of align_by_date
+        windows: Rolling windows in trading days (default: ROLLING_WINDOWS)
+
+    Returns:
+        DataFrame indexed by date with one column per series
+    """
+    if windows is None:
+        windows = ROLLING_WINDOWS
+
+    close1, close2 = aligned['close_1'].to_numpy(float), aligned['close_2'].to_numpy(float)
+    open1, open2 = aligned['open_1'].to_numpy(float), aligned['open_2'].to_numpy(float)
+    change1, change2 = close1 - open1, close2 - open2
+    type1, type2 = aligned['candle_type_1'].to_numpy(), aligned['candle_type_2'].to_numpy()
+
+    direction_match = ((type1 % 2 == 0) == (type2 % 2 == 0)).astype(np.float64)
+    type_match = (type1 == type2).astype(np.float64)
+
+    out = pd.DataFrame(index=aligned.index)
+    out['xauusd_close'] = close1
+    out['gc1_close'] = close2
+    out['basis'] = close2 - close1
+    out['xauusd_change'] = change1
+    out['gc1_change'] = change2
+
+    for window in windows:
+        out[f'corr_close_{window}'] = rolling_corr(close1, close2, window)
+        out[f'corr_change_{window}'] = rolling_corr(change1, change2, window)
+        out[f'dir_match_{window}'] = rolling_mean(direction_match, window) * 100
+        out[f'type_match_{window}'] = rolling_mean(type_match, window) * 100
+
+    # Divergence index: intraday % change spread in units of its recent volatility
+    spread = change1 / open1 * 100 - change2 / open2 * 100
+    with np.errstate(divide='ignore', invalid='ignore'):
+        score = np.abs(spread) / rolling_std(spread, DIVERGENCE_WINDOW)
+    out['divergence_score'] = np.where(np.isfinite(score), score, np.nan)
+    out['direction_diverged'] = (1 - direction_match).astype(np.int64)
+
+    return out.round(VALUE_DECIMALS)
+
+
+def _side_stats(values1: np.ndarray, values2: np.ndarray) -> Dict:
+    mean1, mean2 = float(np.nanmean(values1)), float(np.nanmean(values2))
+    return {
+        'xauusd': round(mean1, VALUE_DECIMALS),
+        'gc1': round(mean2, VALUE_DECIMALS),
+        'diff': round(mean2 - mean1, VALUE_DECIMALS)
+    }
+
+
+def compute_summary(aligned: pd.DataFrame, rolling: pd.DataFrame, top_n: int = TOP_DIVERGENCES,
+                    recent_days: int = RECENT_DIVERGENCE_DAYS) -> Dict:
+    """Whole-history figures (getComparisonStats) plus the divergence lists the compare pages show"""
+    close1, close2 = aligned['close_1'].to_numpy(float), aligned['close_2'].to_numpy(float)
+    change1 = close1 - aligned['open_1'].to_numpy(float)
+    change2 = close2 - aligned['open_2'].to_numpy(float)
+    type1, type2 = aligned['candle_type_1'].to_numpy(), aligned['candle_type_2'].to_numpy()
+    bullish1, bullish2 = type1 % 2 == 0, type2 % 2 == 0
+    direction_match = bullish1 == bullish2
+
+    diverged = rolling[rolling['direction_diverged'] == 1].dropna(subset=['divergence_score'])
+    ranked = diverged.sort_values('divergence_score', ascending=False).head(top_n)
+
+    divergences = []
+    for date, row in ranked.iterrows():
+        src = aligned.loc[date]
+        divergences.append({
+            'date': date,
+            'score': float(row['divergence_score']),
+            'xauusdType': int(src['candle_type_1']),
+            'gc1Type': int(src['candle_type_2']),
+            'xauusdChangePct': round(float((src['close_1'] - src['open_1']) / src['open_1'] * 100), VALUE_DECIMALS),
+            'gc1ChangePct': round(float((src['close_2'] - src['open_2']) / src['open_2'] * 100), VALUE_DECIMALS)
+        })
+
+    recent = aligned.iloc[-recent_days:]
+    recent = recent[(recent['candle_type_1'] % 2 == 0) != (recent['candle_type_2'] % 2 == 0)]
+    recent_divergences = [{'date': date, 'xauusdType': int(row['candle_type_1']), 'gc1Type': int(row['candle_type_2'])}
+                          for date, row in recent.iterrows()]
+
+    # Direction agreement by weekday, Monday..Friday (renderAgreementChart)
+    weekday = pd.to_datetime(aligned.index).dayofweek.to_numpy()
+    match_by_dow = [round(float(direction_match[weekday == dow].mean() * 100), VALUE_DECIMALS)
+                    if (weekday == dow).any() else 0.0 for dow in range(5)]
+
+    dx = change1 - change1.mean()
+    slope_denominator = float((dx * dx).sum())
+    beta = float((dx * (change2 - change2.mean())).sum() / slope_denominator) if slope_denominator != 0 else 0.0
+
+    latest = rolling.iloc[-1]
+    return {
+        'generated': pd.Timestamp.now(tz='UTC').strftime('%Y-%m-%d %H:%M:%S'),
+        'totalDays': int(len(aligned)),
+        'firstDate': aligned.index[0],
+        'lastDate': aligned.index[-1],
+        'priceCorr': round(_pearson(close1, close2), VALUE_DECIMALS),
+        'changeCorr': round(_pearson(change1, change2), VALUE_DECIMALS),
+        'changeBeta': round(beta, VALUE_DECIMALS),
+        'directionMatch': round(float(direction_match.mean() * 100), VALUE_DECIMALS),
+        'directionMatchByDow': match_by_dow,
+        'typeMatch': round(float((type1 == type2).mean() * 100), VALUE_DECIMALS),
+        'avgRange': _side_stats(aligned['high_1'].to_numpy(float) - aligned['low_1'].to_numpy(float),
+                                aligned['high_2'].to_numpy(float) - aligned['low_2'].to_numpy(float)),
+        'avgBody': _side_stats(aligned['body_size_1'].to_numpy(float), aligned['body_size_2'].to_numpy(float)),
+        'bullishPct': {
+            'xauusd': round(float(bullish1.mean() * 100), VALUE_DECIMALS),
+            'gc1': round(float(bullish2.mean() * 100), VALUE_DECIMALS)
+        },
+        'divergenceDays': int((~direction_match).sum()),
+        'latest': {col: (None if pd.isna(val) else float(val)) for col, val in latest.items()},
+        'topDivergences': divergences,
+        'recentDivergences': recent_divergences
+    }
+
+
+def update_rolling_csv(aligned: pd.DataFrame, filename: str, windows: List[int] = None,
+                       full: bool = False) -> Optional[pd.DataFrame]:
+    """
+    Bring the exported rolling series up to date, appending only new dates
+
+    Only the rows after the last exported date are computed, from a tail slice
+    long enough to fill the largest window. The file is rebuilt when it is
+    missing, its columns changed, or its last date is no longer in the data.
+
+    Args:
+        aligned: Output of align_by_date
+        filename: Rolling series CSV path
+        windows: Rolling windows in trading days
+        full: Force a full rebuild
+
+    Returns:
+        Full rolling series DataFrame or None if failed
+    """
+    if windows is None:
+        windows = ROLLING_WINDOWS
+
+    try:
+        filepath = Path(filename)
+        existing = None
+        if filepath.exists() and not full:
+            existing = pd.read_csv(filepath, index_col='date')
+            if list(existing.columns) != rolling_columns(windows) or existing.empty \
+                    or existing.index[-1] not in aligned.index:
+                logger.info(f"{filepath} is out of date, rebuilding")
+                existing = None
+
+        if existing is None:
+            rolling = compute_rolling_series(aligned, windows)
+            rolling.to_csv(filepath, index_label='date', encoding='utf-8')
+            logger.info(f"Rolling comparison series saved to {filepath} ({len(rolling)} days)")
+            return rolling
+
+        last_pos = aligned.index.get_loc(existing.index[-1])
+        n_new = len(aligned) - last_pos - 1
+        if n_new <= 0:
+            logger.info(f"Rolling comparison series already up to date ({existing.index[-1]})")
+            return existing
+
+        tail_len = n_new + max(max(windows), DIVERGENCE_WINDOW)
+        new_rows = compute_rolling_series(aligned.iloc[-tail_len:], windows).iloc[-n_new:]
+        new_rows.to_csv(filepath, mode='a', header=False, encoding='utf-8')
+        logger.info(f"Appended {n_new} days to {filepath}")
+        return pd.concat([existing, new_rows])
+
+    except Exception as e:
+        logger.error(f"Error updating rolling comparison series {filename}: {e}")
+        return None
+
+
+def export_comparison(output_dir: str = None, windows: List[int] = None,
+                      full: bool = False) -> Optional[Dict]:
+    """
+    Align the daily CSVs, update the rolling series and write the summary JSON
+
+    Args:
+        output_dir: Directory containing the daily CSVs (default: current directory)
+        windows: Rolling windows in trading days
+        full: Force a full rebuild of the rolling series
+
+    Returns:
+        Summary dictionary or None if failed
+    """
+    base_dir = Path(output_dir) if output_dir else Path('.')
+    paths = {key: base_dir / name for key, name in COMPARISON_FILES.items()}
+
+    for key in ['xauusd', 'gc1']:
+        if not paths[key].exists():
+            logger.error(f"Input file not found: {paths[key]}")
+            return None
+
+    try:
+        aligned = align_by_date(pd.read_csv(paths['xauusd']), pd.read_csv(paths['gc1']))
+        if aligned.empty:
+            logger.error("No common dates between XAUUSD and GC1!")
+            return None
+
+        logger.info(f"Aligned {len(aligned)} common days ({aligned.index[0]} to {aligned.index[-1]})")
+        rolling = update_rolling_csv(aligned, str(paths['rolling']), windows, full)
+        if rolling is None:
+            return None
+
+        summary = compute_summary(aligned, rolling)
+        with open(paths['summary'], 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+        logger.info(f"Comparison summary saved to {paths['summary']}")
+        return summary
+
+    except Exception as e:
+        logger.error(f"Error computing comparison stats: {e}")
+        return None
+
+
+def main():
+    """Compute rolling XAUUSD / GC1! comparison series from existing daily CSVs"""
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='Rolling XAUUSD / GC1! correlation and divergence engine')
+    parser.add_argument('--output-dir', type=str, default=None,
+                        help='Directory containing the daily CSV files')
+    parser.add_argument('--windows', type=int, nargs='+', default=ROLLING_WINDOWS,
+                        help=f'Rolling windows in trading days (default: {ROLLING_WINDOWS})')
+    parser.add_argument('--full', action='store_true',
+                        help='Rebuild the rolling series instead of appending new days')
+    args = parser.parse_args()
+
+    export_comparison(output_dir=args.output_dir, windows=args.windows, full=args.full)
+
+
+if __name__ == "__main__":
+    main()
@@ -188,6 +188,68 @@ function calculateNextCandleDistribution(filteredData) {
     };
 }
 
+// ============================================
+// Bootstrap Confidence Intervals (<market>_pattern_bootstrap.json from pattern_bootstrap.py)
+// ============================================
+
+const patternBootstrapCache = {};
+
+async function loadPatternBootstrap(marketId = null) {
+    const market = marketId || currentMarket;
+    if (patternBootstrapCache[market] !== undefined) return patternBootstrapCache[market];
+
+    patternBootstrapCache[market] = null;
+    try {
+        const response = await fetch(MARKETS[market].dataFile.replace('_10years_data.csv', '_pattern_bootstrap.json'));
+        if (response.ok) {
+            patternBootstrapCache[market] = await response.json();
+            console.log('Pattern bootstrap loaded, generated:', patternBootstrapCache[market].generated);
+        }
+    } catch (error) {
+        console.log('No pattern bootstrap JSON file found');
+    }
+    return patternBootstrapCache[market];
+}
+
+// Bootstrap entry for the pattern / lookback / pattern-days combination the prediction used, or null
+function getPatternBootstrap(pattern, prediction) {
+    const bootstrap = patternBootstrapCache[currentMarket];
+    if (!bootstrap || !bootstrap.lookbacks || pattern.usedDays === 0) return null;
+
+    const key = [pattern.prev1, pattern.prev2, pattern.prev3].slice(0, pattern.usedDays).join('-');
+    const byDays = bootstrap.lookbacks[String(pattern.usedPeriod)];
+    const entry = byDays && byDays[String(pattern.usedDays)] ? byDays[String(pattern.usedDays)][key] : null;
+
+    // Built from an older CSV: the sample no longer matches what the page counted
+    if (!entry || entry.total !== prediction.total) return null;
+    return entry;
+}
+
+function renderPlanConfidence(entry, candleType, suffix) {
+    const el = document.getElementById('planConfidence' + suffix);
+    if (!el) return;
+
+    if (!entry) {
+        el.className = 'plan-confidence';
+        el.textContent = '';
+        return;
+    }
+
+    const confidence = Math.round(patternBootstrapCache[currentMarket].confidence * 100);
+    const ci = `${confidence}% CI ${entry.ci_lower[candleType].toFixed(1)}% - ${entry.ci_upper[candleType].toFixed(1)}%`;
+
+    if (entry.lowSample) {
+        el.className = 'plan-confidence low-sample';
+        el.textContent = `${ci} · Low sample (${entry.total} days)`;
+    } else if (entry.topSeparated) {
+        el.className = 'plan-confidence significant';
+        el.textContent = `${ci} · Plan A clearly ahead of Plan B`;
+    } else {
+        el.className = 'plan-confidence';
+        el.textContent = `${ci} · Plan A and Plan B overlap`;
+    }
+}
+
 // ============================================
 // Trade Setup Calculation
 // ============================================
@@ -519,7 +581,7 @@ function renderCandleMetrics(metrics, containerId = 'candleMetrics') {
 }
 
 // Render both Plan A and Plan B
-function renderBothPlans(prediction, avgDistances, openPrice) {
+function renderBothPlans(prediction, avgDistances, openPrice, bootstrapEntry = null) {
     // Plan A (Top 1)
     const topType = prediction.topType;
     const topIsBullish = topType % 2 === 0;
@@ -532,6 +594,7 @@ function renderBothPlans(prediction, avgDistances, openPrice) {
     renderTradeLevels(setupA, openPrice, 'tradeLevelsA');
     renderCandleMetrics(setupA.metrics, 'candleMetricsA');
     renderTradeSetup(setupA, topType, 'A');
+    renderPlanConfidence(bootstrapEntry, topType, 'A');
 
     // Plan B (Top 2)
     const secondType = prediction.secondType;
@@ -545,6 +608,7 @@ function renderBothPlans(prediction, avgDistances, openPrice) {
     renderTradeLevels(setupB, openPrice, 'tradeLevelsB');
     renderCandleMetrics(setupB.metrics, 'candleMetricsB');
     renderTradeSetup(setupB, secondType, 'B');
+    renderPlanConfidence(bootstrapEntry, secondType, 'B');
 
     // Return the primary setup (Plan A) for summary stats
     return setupA;
@@ -643,7 +707,7 @@ function updatePredictionWithPeriod() {
     renderPatternFlow(pattern, prediction);
 
     // Render both plans (Plan A = Top 1, Plan B = Top 2)
-    renderBothPlans(prediction, avgDistances, openPrice);
+    renderBothPlans(prediction, avgDistances, openPrice, getPatternBootstrap(pattern, prediction));
 
     renderSummaryStats(prediction, avgRange);
 
@@ -751,6 +815,7 @@ async function init() {
     try {
         rawData = await loadData();
         console.log('Daily Plan - Data loaded:', rawData.length, 'rows');
+        await loadPatternBootstrap();
 
         // Use 1 year data by default for calculations
         const defaultPeriod = 365;
@@ -794,7 +859,7 @@ async function init() {
         renderPatternFlow(pattern, prediction);
 
         // Render both plans (Plan A = Top 1, Plan B = Top 2)
-        const setup = renderBothPlans(prediction, avgDistances, openPrice);
+        const setup = renderBothPlans(prediction, avgDistances, openPrice, getPatternBootstrap(pattern, prediction));
 
         renderSummaryStats(prediction, avgRange);
         renderMiniCandleChart(rawData, 20);                  // Mini candlestick chart
@@ -809,6 +874,7 @@ async function init() {
         // Initialize market selector with refresh callback
         initMarketSelector(async (newData) => {
             rawData = newData;
+            await loadPatternBootstrap();
 
             // Get current period and pattern selection
             const periodSelect = document.getElementById('predictionPeriodSelect');
@@ -843,7 +909,7 @@ async function init() {
             renderPatternFlow(newPattern, newPrediction);
 
             // Render both plans (Plan A = Top 1, Plan B = Top 2)
-            renderBothPlans(newPrediction, newAvgDistances, newOpenPrice);
+            renderBothPlans(newPrediction, newAvgDistances, newOpenPrice, getPatternBootstrap(newPattern, newPrediction));
 
             renderSummaryStats(newPrediction, newAvgRange);
             renderMiniCandleChart(rawData, 20);              // Mini candlestick chart
@@ -26,12 +26,46 @@ function updatePeriodInfo(selectId, infoId) {
 // Full Mini Candlestick Chart (50 candles)
 // ============================================
 
-function renderFullMiniChart(data, numCandles = 50) {
+function renderFullMiniChart(data, numCandles = 50, visibleBars = numCandles) {
     const container = document.getElementById('fullMiniChart');
     if (!container || data.length < numCandles) return;
 
+    // Long ranges draw a pre-aggregated level (chart_decimation.py) instead of every bar
+    if (visibleBars > numCandles) {
+        renderFullMiniChartLevels(data, numCandles, visibleBars);
+        return;
+    }
+
     // Get last N candles
-    const candles = data.slice(-numCandles);
+    drawFullMiniCandles(data, data.slice(-numCandles));
+}
+
+async function renderFullMiniChartLevels(data, numCandles, visibleBars) {
+    const bars = Math.min(visibleBars, data.length);
+    const level = selectChartLevel(await loadChartLevels(), bars, numCandles);
+    if (!level) {
+        // No chart levels exported: fall back to the latest raw candles
+        drawFullMiniCandles(data, data.slice(-numCandles));
+        return;
+    }
+
+    // Buckets covering the last `bars` bars
+    const count = Math.min(level.bars, Math.ceil(bars / level.bucket));
+    const candles = [];
+    for (let i = level.bars - count; i < level.bars; i++) {
+        candles.push({
+            datetime: level.datetime[i],
+            open: level.open[i],
+            high: level.high[i],
+            low: level.low[i],
+            close: level.close[i]
+        });
+    }
+    drawFullMiniCandles(data, candles);
+}
+
+function drawFullMiniCandles(data, candles) {
+    const container = document.getElementById('fullMiniChart');
 
     // Find min/max for scaling
     let minLow = Infinity, maxHigh = -Infinity;
@@ -48,7 +82,8 @@ function renderFullMiniChart(data, numCandles = 50) {
 
     // Generate candle HTML
     const candlesHtml = candles.map((candle, index) => {
-        const isBull = isBullish(candle.candle_type);
+        // Aggregated candles have no candle_type; color them by direction
+        const isBull = candle.candle_type !== undefined ? isBullish(candle.candle_type) : candle.close >= candle.open;
         if (isBull) bullishCount++; else bearishCount++;
         totalRange += (candle.high - candle.low);
 
@@ -76,7 +111,7 @@ function renderFullMiniChart(data, numCandles = 50) {
     // Update stats
     document.getElementById('chartBullish').textContent = bullishCount;
     document.getElementById('chartBearish').textContent = bearishCount;
-    document.getElementById('chartAvgRange').textContent = '$' + (totalRange / numCandles).toFixed(2);
+    document.getElementById('chartAvgRange').textContent = '$' + (totalRange / candles.length).toFixed(2);
 
     // Update axis labels
     const firstCandle = candles[0];
@@ -838,6 +873,14 @@ function updateCandleTypesCards() {
 }
 
 function initPeriodSelectors() {
+    // Mini chart range: 50 raw candles or a decimated multi-year overview
+    const miniChartRange = document.getElementById('miniChartRangeSelect');
+    if (miniChartRange) {
+        miniChartRange.addEventListener('change', () => {
+            renderFullMiniChart(rawData, 50, parseInt(miniChartRange.value));
+        });
+    }
+
     // Distance chart period selector
     const distanceSelect = document.getElementById('distancePeriodSelect');
     if (distanceSelect) {
@@ -863,7 +906,8 @@ async function renderDashboard(data) {
     const avgDistances = calculateAvgDistanceByType(filteredData);
 
     await updateHeroStats(data);
-    renderFullMiniChart(data, 50);  // 50 candles mini chart
+    const miniChartRange = document.getElementById('miniChartRangeSelect');
+    renderFullMiniChart(data, 50, miniChartRange ? parseInt(miniChartRange.value) : 50);  // 50 candles mini chart
     createSentimentChart(sentiment);
     createTypeDistributionChart(typeDistribution);
     createAvgDistanceChart(avgDistances);
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Panel Indicators - Batched Indicator Computation for Many Symbols
+Numpy/Scipy kernels over (symbols x time) arrays, matching TA-Lib defaults
+Version 1.0
+"""
+
+import logging
+from typing import Optional, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+logger = logging.getLogger(__name__)
+
+# ==================== Configuration ====================
+PANEL_OHLC_COLUMNS = ['open', 'high', 'low', 'close']
+# ========================================================
+
+
+def pack_panel(datasets: Dict[str, pd.DataFrame],
+               columns: List[str] = None) -> Tuple[List[str], Dict[str, np.ndarray], np.ndarray]:
+    """
+    Pack per-symbol frames into left-aligned (symbols x time) arrays
+
+    Row s holds symbol s's own bar sequence starting at column 0, padded with NaN
+    after its last bar. Aligning by bar position (not by date) keeps every row a
+    contiguous series, so the recursive indicators seed at the same column for
+    all symbols and match what TA-Lib computes per symbol.
+
+    Args:
+        datasets: Mapping of symbol key to OHLC DataFrame
+        columns: Columns to pack (default: open/high/low/close)
+
+    Returns:
+        Tuple of (symbol keys, {column: 2D array}, lengths per symbol)
+    """
+    if columns is None:
+        columns = PANEL_OHLC_COLUMNS
+
+    keys = list(datasets.keys())
+    lengths = np.array([len(datasets[key]) for key in keys], dtype=np.int64)
+    n_time = int(lengths.max()) if len(keys) else 0
+
+    arrays = {}
+    for col in columns:
+        arr = np.full((len(keys), n_time), np.nan)
+        for row, key in enumerate(keys):
+            arr[row, :lengths[row]] = datasets[key][col].to_numpy(dtype=np.float64)
+        arrays[col] = arr
+
+    return keys, arrays, lengths
+
+
+def _nan_panel(x: np.ndarray) -> np.ndarray:
+    return np.full(x.shape, np.nan)
+
+
+def panel_sma(x: np.ndarray, period: int) -> np.ndarray:
+    """Simple moving average along the time axis (TA-Lib SMA)"""
+    out = _nan_panel(x)
+    if x.shape[1] >= period:
+        out[:, period - 1:] = sliding_window_view(x, period, axis=1).mean(axis=-1)
+    return out
+
+
+def panel_stddev(x: np.ndarray, period: int) -> np.ndarray:
+    """Population standard deviation along the time axis (TA-Lib STDDEV, nbdev=1)"""
+    out = _nan_panel(x)
+    if x.shape[1] >= period:
+        out[:, period - 1:] = sliding_window_view(x, period, axis=1).std(axis=-1)
+    return out
+
+
+def _recursive_smooth(x: np.ndarray, seed: np.ndarray, k: float) -> np.ndarray:
+    """y[t] = y[t-1] + k * (x[t] - y[t-1]) for every row, starting from seed"""
+    zi = ((1 - k) * seed)[:, None]
+    y, _ = lfilter([k], [1.0, -(1 - k)], x, axis=1, zi=zi)
+    return y
+
+
+def panel_ema(x: np.ndarray, period: int, seed_start: int = 0) -> np.ndarray:
+    """
+    Exponential moving average (TA-Lib EMA, SMA-seeded)
+
+    Args:
+        x: (symbols x time) values
+        period: EMA period
+        seed_start: First column of the SMA seed window (non-zero for MACD alignment)
+    """
+    out = _nan_panel(x)
+    seed_idx = seed_start + period - 1
+    if x.shape[1] <= seed_idx:
+        return out
+
+    out[:, seed_idx] = x[:, seed_start:seed_idx + 1].mean(axis=1)
+    out[:, seed_idx + 1:] = _recursive_smooth(x[:, seed_idx + 1:], out[:, seed_idx], 2.0 / (period + 1))
+    return out
+
+
+def _wilder(x: np.ndarray, period: int) -> np.ndarray:
+    """Wilder smoothing of x[:, 1:] seeded with the mean of x[:, 1:period+1]"""
+    out = _nan_panel(x)
+    if x.shape[1] <= period:
+        return out
+
+    out[:, period] = x[:, 1:period + 1].mean(axis=1)
+    out[:, period + 1:] = _recursive_smooth(x[:, period + 1:], out[:, period], 1.0 / period)
+    return out
+
+
+def panel_rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Relative Strength Index (TA-Lib RSI)"""
+    change = np.full(close.shape, np.nan)
+    change[:, 1:] = np.diff(close, axis=1)
+
+    avg_gain = _wilder(np.where(change > 0, change, 0.0), period)
+    avg_loss = _wilder(np.where(change < 0, -change, 0.0), period)
+    total = avg_gain + avg_loss
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(total != 0, 100 * avg_gain / total, 0.0)
+    rsi[np.isnan(total)] = np.nan
+    return rsi
+
+
+def panel_atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Average True Range (TA-Lib ATR)"""
+    prev_close = np.full(close.shape, np.nan)
+    prev_close[:, 1:] = close[:, :-1]
+
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    true_range[:, 0] = np.nan
+    return _wilder(true_range, period)
+
+
+def panel_macd(close: np.ndarray, fast: int = 12, slow: int = 26,
+               signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD line, signal and histogram (TA-Lib MACD, both EMAs seeded at the slow lookback)"""
+    macd_line = _nan_panel(close)
+    macd_signal = _nan_panel(close)
+
+    start = slow - 1
+    if close.shape[1] > start:
+        fast_ema = panel_ema(close, fast, seed_start=start - fast + 1)
+        slow_ema = panel_ema(close, slow)
+        macd_line = fast_ema - slow_ema
+        macd_signal[:, start:] = panel_ema(macd_line[:, start:], signal)
+
+    # TA-Lib only reports the MACD line once the signal line exists
+    macd_line[np.isnan(macd_signal)] = np.nan
+    return macd_line, macd_signal, macd_line - macd_signal
+
+
+def panel_bbands(close: np.ndarray, period: int = 5,
+                 nbdev: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Bollinger Bands (SMA 5, 2 standard deviations)
+
+    Period 5 is the TA-Lib 0.4 default the published CSVs were built with;
+    TA-Lib 0.6+ changed the BBANDS default period to 20.
+    """
+    middle = panel_sma(close, period)
+    deviation = nbdev * panel_stddev(close, period)
+    return middle + deviation, middle, middle - deviation
+
+
+def panel_candle_types(open_: np.ndarray, high: np.ndarray, low: np.ndarray,
+                       close: np.ndarray) -> np.ndarray:
+    """Vectorized classify_candle_type over the whole panel (same thresholds and order)"""
+    total_range = high - low
+    with np.errstate(divide='ignore', invalid='ignore'):
+        body_pct = np.abs(close - open_) / total_range
+        upper_pct = (high - np.maximum(open_, close)) / total_range
+        lower_pct = (np.minimum(open_, close) - low) / total_range
+
+    bullish = close > open_
+    conditions = [
+        total_range == 0,
+        body_pct < 0.10,
+        body_pct > 0.70,
+        upper_pct > 0.40,
+        lower_pct > 0.40
+    ]
+    choices = [
+        np.zeros(open_.shape, dtype=np.int64),
+        np.where(bullish, 0, 1),
+        np.where(bullish, 2, 3),
+        np.where(bullish, 6, 7),
+        np.where(bullish, 8, 9)
+    ]
+    return np.select(conditions, choices, default=np.where(bullish, 4, 5))
+
+
+def compute_panel_indicators(arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Compute every calculate_indicators column for a whole (symbols x time) panel
+
+    Args:
+        arrays: {'open', 'high', 'low', 'close'} 2D float arrays
+
+    Returns:
+        Dictionary mapping indicator column names to 2D arrays
+    """
+    open_, high, low, close = (arrays[col] for col in PANEL_OHLC_COLUMNS)
+    out = {}
+
+    out['MA12'] = panel_sma(close, 12)
+    out['MA26'] = panel_sma(close, 26)
+    out['RSI14'] = panel_rsi(close, 14)
+    out['ATR14'] = panel_atr(high, low, close, 14)
+    out['EMA12'] = panel_ema(close, 12)
+    out['EMA26'] = panel_ema(close, 26)
+    out['MACD'], out['MACD_signal'], out['MACD_hist'] = panel_macd(close)
+    out['BB_upper'], out['BB_middle'], out['BB_lower'] = panel_bbands(close)
+
+    out['high_open_dist'] = high - open_
+    out['open_low_dist'] = open_ - low
+
+    out['body_size'] = np.abs(close - open_)
+    out['upper_wick'] = high - np.maximum(open_, close)
+    out['lower_wick'] = np.minimum(open_, close) - low
+
+    total_range = high - low
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for name, part in [('body_ratio', 'body_size'), ('wick_ratio_upper', 'upper_wick'),
+                           ('wick_ratio_lower', 'lower_wick')]:
+            out[name] = np.where(total_range != 0, out[part] / total_range, 0.0)
+
+    out['candle_type'] = panel_candle_types(open_, high, low, close)
+    return out
+
+
+def unpack_panel(keys: List[str], results: Dict[str, np.ndarray],
+                 lengths: np.ndarray) -> Dict[str, Dict[str, np.ndarray]]:
+    """Split panel results back into per-symbol 1D arrays (padding removed)"""
+    return {
+        key: {name: values[row, :lengths[row]] for name, values in results.items()}
+        for row, key in enumerate(keys)
+    }
+
+
+def calculate_panel(datasets: Dict[str, pd.DataFrame]) -> Optional[Dict[str, Dict[str, np.ndarray]]]:
+    """
+    Pack, compute and unpack indicators for many symbols in one batch
+
+    Args:
+        datasets: Mapping of symbol key to OHLC DataFrame
+
+    Returns:
+        Mapping of symbol key to {column: 1D array} or None if failed
+    """
+    if not datasets:
+        logger.error("No datasets provided for panel indicator calculation")
+        return None
+
+    for key, data in datasets.items():
+        missing_cols = [col for col in PANEL_OHLC_COLUMNS if col not in data.columns]
+        if missing_cols:
+            logger.error(f"Missing required columns for {key}: {missing_cols}")
+            return None
+
+    keys, arrays, lengths = pack_panel(datasets)
+    logger.info(f"Computing panel indicators for {len(keys)} symbols x {arrays['close'].shape[1]} bars...")
+    return unpack_panel(keys, compute_panel_indicators(arrays), lengths)
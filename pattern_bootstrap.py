@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Pattern Bootstrap - Confidence Intervals for Next-Candle Probabilities
+Block-bootstrap CIs for the Pattern Predictor (dashboard.js / daily-plan.js)
+Version 1.0
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from statistics import NormalDist
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# ==================== Configuration ====================
+N_CANDLE_TYPES = 10
+DEFAULT_N_RESAMPLES = 2000
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_SEED = 42
+MIN_BOOTSTRAP_SAMPLES = 10  # Below this, patterns get Wilson intervals and lowSample: true
+
+# Same period levels as getPatternWithFallback() in daily-plan.js (rows, not calendar days)
+LOOKBACK_PERIODS = [365, 730, 1095, 1825, 3650]
+
+# Pattern prefixes: 1 = prev_candle_1, 2 = prev_candle_1..2, 3 = prev_candle_1..3
+PATTERN_DAYS = [1, 2, 3]
+
+BOOTSTRAP_INPUTS = {
+    'xauusd': {
+        'input_file': 'xauusd_10years_data.csv',
+        'output_file': 'xauusd_pattern_bootstrap.json'
+    },
+    'gc1': {
+        'input_file': 'gc1_10years_data.csv',
+        'output_file': 'gc1_pattern_bootstrap.json'
+    }
+}
+# ========================================================
+
+
+def default_block_length(n: int) -> int:
+    """Block length for the moving-block bootstrap (n^(1/3) rule of thumb)"""
+    return max(1, int(round(n ** (1.0 / 3.0))))
+
+
+def wilson_interval(counts: np.ndarray, n: int, confidence: float = DEFAULT_CONFIDENCE) -> Tuple[np.ndarray, np.ndarray]:
+    """Wilson score interval (in percent) for counts out of n; stays wide at small n"""
+    z = NormalDist().inv_cdf(1 - (1 - confidence) / 2)
+    p = np.asarray(counts, dtype=np.float64) / n
+    center = (p + z * z / (2 * n)) / (1 + z * z / n)
+    half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    return np.clip(center - half, 0, 1) * 100, np.clip(center + half, 0, 1) * 100
+
+
+def block_bootstrap_distribution(outcomes: np.ndarray, n_resamples: int = DEFAULT_N_RESAMPLES,
+                                 block_length: int = None, confidence: float = DEFAULT_CONFIDENCE,
+                                 rng: np.random.Generator = None) -> Dict:
+    """
+    Moving-block bootstrap of the next-candle type distribution
+
+    All resamples are drawn at once as an (n_resamples x n) index matrix, so the
+    cost is a handful of array operations regardless of n_resamples.
+
+    Patterns with fewer than MIN_BOOTSTRAP_SAMPLES rows are not resampled:
+    their intervals are Wilson score intervals and they are marked lowSample.
+    Bootstrap intervals that collapse to a single value (e.g. a type never
+    seen) are replaced by the Wilson interval for that type as well.
+
+    Args:
+        outcomes: Next candle_type values (0-9) in chronological order
+        n_resamples: Number of bootstrap resamples
+        block_length: Block length (default: n^(1/3))
+        confidence: Confidence level for the percentile interval
+        rng: Numpy random generator
+
+    Returns:
+        Dictionary with percentages, CI bounds per type and bullish share
+    """
+    outcomes = np.asarray(outcomes, dtype=np.int64)
+    n = len(outcomes)
+    if rng is None:
+        rng = np.random.default_rng(DEFAULT_SEED)
+
+    counts = np.bincount(outcomes, minlength=N_CANDLE_TYPES)
+    percentages = counts / n * 100
+    bull_count = int(counts[0::2].sum())
+
+    wilson_lower, wilson_upper = wilson_interval(counts, n, confidence)
+    bull_wilson_lower, bull_wilson_upper = wilson_interval(np.array([bull_count]), n, confidence)
+
+    if n < MIN_BOOTSTRAP_SAMPLES:
+        return _distribution_summary(n, 0, counts, percentages, wilson_lower, wilson_upper,
+                                     float(bull_wilson_lower[0]), float(bull_wilson_upper[0]), 'wilson')
+
+    if block_length is None:
+        block_length = default_block_length(n)
+    block_length = min(block_length, n)
+
+    # Draw block starts and expand each block into consecutive indices
+    n_blocks = -(-n // block_length)
+    starts = rng.integers(0, n - block_length + 1, size=(n_resamples, n_blocks))
+    idx = (starts[:, :, None] + np.arange(block_length)).reshape(n_resamples, -1)[:, :n]
+    samples = outcomes[idx]
+
+    # Count types per resample with a single bincount over offset codes
+    offsets = np.arange(n_resamples, dtype=np.int64)[:, None] * N_CANDLE_TYPES
+    boot_counts = np.bincount((samples + offsets).ravel(),
+                              minlength=n_resamples * N_CANDLE_TYPES).reshape(n_resamples, N_CANDLE_TYPES)
+    boot_pct = boot_counts / n * 100
+    boot_bull = boot_pct[:, 0::2].sum(axis=1)
+
+    alpha = (1 - confidence) / 2 * 100
+    lower, upper = np.percentile(boot_pct, [alpha, 100 - alpha], axis=0)
+    bull_lower, bull_upper = np.percentile(boot_bull, [alpha, 100 - alpha])
+
+    # A zero-width bootstrap interval claims certainty; use Wilson there instead
+    degenerate = upper - lower <= 0
+    lower = np.where(degenerate, wilson_lower, lower)
+    upper = np.where(degenerate, wilson_upper, upper)
+    if bull_upper - bull_lower <= 0:
+        bull_lower, bull_upper = float(bull_wilson_lower[0]), float(bull_wilson_upper[0])
+
+    return _distribution_summary(n, block_length, counts, percentages, lower, upper,
+                                 bull_lower, bull_upper, 'bootstrap')
+
+
+def _distribution_summary(n: int, block_length: int, counts: np.ndarray, percentages: np.ndarray,
+                          lower: np.ndarray, upper: np.ndarray, bull_lower: float, bull_upper: float,
+                          method: str) -> Dict:
+    """JSON-ready summary of one pattern's next-candle distribution"""
+    order = np.argsort(-percentages, kind='stable')
+    top_type, second_type = int(order[0]), int(order[1])
+
+    return {
+        'total': int(n),
+        'block_length': int(block_length),
+        'method': method,
+        'lowSample': bool(n < MIN_BOOTSTRAP_SAMPLES),
+        'counts': counts.tolist(),
+        'percentages': np.round(percentages, 2).tolist(),
+        'ci_lower': np.round(lower, 2).tolist(),
+        'ci_upper': np.round(upper, 2).tolist(),
+        'topType': top_type,
+        'secondType': second_type,
+        # Plan A is only distinguishable from Plan B when the intervals do not overlap
+        'topSeparated': bool(n >= MIN_BOOTSTRAP_SAMPLES and lower[top_type] > upper[second_type]),
+        'bullPct': round(float(percentages[0::2].sum()), 2),
+        'bullCiLower': round(float(bull_lower), 2),
+        'bullCiUpper': round(float(bull_upper), 2)
+    }
+
+
+def _pattern_groups(data: pd.DataFrame, pattern_days: int) -> Dict[str, np.ndarray]:
+    """Group next-candle outcomes by pattern key ("prev1-prev2-prev3"), oldest first"""
+    prev_cols = [f'prev_candle_{i}' for i in range(1, pattern_days + 1)]
+    df = data.dropna(subset=prev_cols + ['candle_type'])
+    if df.empty:
+        return {}
+
+    keys = df[prev_cols].astype(int).astype(str).agg('-'.join, axis=1)
+    outcomes = df['candle_type'].astype(int).to_numpy()
+    return {key: outcomes[positions] for key, positions in keys.groupby(keys).indices.items()}
+
+
+def _bootstrap_lookback(task: Tuple) -> Tuple[str, int, Dict]:
+    """Process pool worker: bootstrap every pattern prefix for one (symbol, lookback)"""
+    symbol_key, lookback, data, n_resamples, confidence, min_samples, seed = task
+    rng = np.random.default_rng(seed)
+
+    result = {}
+    for pattern_days in PATTERN_DAYS:
+        patterns = {}
+        for key, outcomes in _pattern_groups(data, pattern_days).items():
+            if len(outcomes) < min_samples:
+                continue
+            patterns[key] = block_bootstrap_distribution(outcomes, n_resamples=n_resamples,
+                                                         confidence=confidence, rng=rng)
+        result[str(pattern_days)] = patterns
+
+    return symbol_key, lookback, result
+
+
+def run_pattern_bootstrap(datasets: Dict[str, pd.DataFrame], lookbacks: List[int] = None,
+                          n_resamples: int = DEFAULT_N_RESAMPLES, confidence: float = DEFAULT_CONFIDENCE,
+                          min_samples: int = 1, max_workers: int = None,
+                          seed: int = DEFAULT_SEED) -> Dict[str, Dict]:
+    """
+    Compute bootstrap CIs for every symbol, lookback and pattern prefix
+
+    Each (symbol, lookback) pair is an independent task on a process pool.
+
+    Args:
+        datasets: Mapping of symbol key to daily DataFrame (pipeline output)
+        lookbacks: Lookback periods in rows (default: LOOKBACK_PERIODS)
+        n_resamples: Bootstrap resamples per pattern
+        confidence: Confidence level for the intervals
+        min_samples: Skip patterns with fewer matching rows
+        max_workers: Process pool size (default: CPU count)
+        seed: Base seed; each task gets an independent child stream
+
+    Returns:
+        Dictionary mapping symbol keys to {lookback: {pattern_days: {pattern: stats}}}
+    """
+    if lookbacks is None:
+        lookbacks = LOOKBACK_PERIODS
+
+    required_columns = ['candle_type', 'prev_candle_1', 'prev_candle_2', 'prev_candle_3']
+    tasks = []
+    for symbol_key, data in datasets.items():
+        if data is None or data.empty:
+            logger.warning(f"No data for {symbol_key}, skipping bootstrap")
+            continue
+        missing_cols = [col for col in required_columns if col not in data.columns]
+        if missing_cols:
+            logger.error(f"Missing required columns for {symbol_key}: {missing_cols}")
+            continue
+
+        subset = data[required_columns]
+        for lookback in sorted(set(lookbacks)):
+            tasks.append([symbol_key, lookback, subset.iloc[-lookback:]])
+
+    child_seeds = np.random.SeedSequence(seed).spawn(len(tasks))
+    tasks = [tuple(task) + (n_resamples, confidence, min_samples, child)
+             for task, child in zip(tasks, child_seeds)]
+
+    results = {symbol_key: {} for symbol_key, *_ in tasks}
+    if not tasks:
+        return results
+
+    logger.info(f"Bootstrapping {len(tasks)} symbol/lookback tasks ({n_resamples} resamples each)...")
+    # Spawned workers: this may run from a refresh DAG thread, and forking a
+    # multi-threaded process can leave a held logging/IO lock in the child
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                             mp_context=multiprocessing.get_context('spawn')) as executor:
+        for symbol_key, lookback, result in executor.map(_bootstrap_lookback, tasks):
+            results[symbol_key][str(lookback)] = result
+
+    return results
+
+
+def save_bootstrap_json(result: Dict, symbol_key: str, filename: str, n_resamples: int,
+                        confidence: float) -> bool:
+    """Save bootstrap results for one symbol to JSON"""
+    try:
+        filepath = Path(filename)
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+
+        payload = {
+            'symbol': symbol_key,
+            'generated': pd.Timestamp.now(tz='UTC').strftime('%Y-%m-%d %H:%M:%S'),
+            'resamples': n_resamples,
+            'confidence': confidence,
+            'lookbacks': result
+        }
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, separators=(',', ':'))
+
+        logger.info(f"Bootstrap CIs saved to {filepath}")
+        return True
+
+    except Exception as e:
+        logger.error(f"Error saving bootstrap results to {filename}: {e}")
+        return False
+
+
+def export_pattern_bootstrap(output_dir: str = None, symbols: List[str] = None,
+                             n_resamples: int = DEFAULT_N_RESAMPLES, confidence: float = DEFAULT_CONFIDENCE,
+                             min_samples: int = 1, max_workers: int = None) -> Dict[str, Dict]:
+    """
+    Load the daily pipeline outputs, bootstrap them and write JSON next to the CSVs
+
+    Args:
+        output_dir: Directory containing the daily CSVs (default: current directory)
+        symbols: Symbol keys to process (default: all in BOOTSTRAP_INPUTS)
+        n_resamples: Bootstrap resamples per pattern
+        confidence: Confidence level for the intervals
+        min_samples: Skip patterns with fewer matching rows
+        max_workers: Process pool size
+
+    Returns:
+        Dictionary mapping symbol keys to their bootstrap results
+    """
+    if symbols is None:
+        symbols = list(BOOTSTRAP_INPUTS.keys())
+
+    base_dir = Path(output_dir) if output_dir else Path('.')
+    datasets = {}
+    for symbol_key in symbols:
+        if symbol_key not in BOOTSTRAP_INPUTS:
+            logger.error(f"Unknown symbol key: {symbol_key}. Available: {list(BOOTSTRAP_INPUTS.keys())}")
+            continue
+        input_file = base_dir / BOOTSTRAP_INPUTS[symbol_key]['input_file']
+        if not input_file.exists():
+            logger.warning(f"Input file not found: {input_file}")
+            continue
+        datasets[symbol_key] = pd.read_csv(input_file)
+
+    results = run_pattern_bootstrap(datasets, n_resamples=n_resamples, confidence=confidence,
+                                    min_samples=min_samples, max_workers=max_workers)
+
+    for symbol_key, result in results.items():
+        output_file = base_dir / BOOTSTRAP_INPUTS[symbol_key]['output_file']
+        save_bootstrap_json(result, symbol_key, str(output_file), n_resamples, confidence)
+
+    return results
+
+
+def main():
+    """Compute pattern bootstrap CIs from existing daily CSVs"""
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='Bootstrap CIs for next-candle pattern probabilities')
+    parser.add_argument('--symbols', nargs='+', choices=['xauusd', 'gc1', 'all'],
+                        default=['all'], help='Symbols to process (default: all)')
+    parser.add_argument('--output-dir', type=str, default=None,
+                        help='Directory containing the daily CSV files')
+    parser.add_argument('--resamples', type=int, default=DEFAULT_N_RESAMPLES,
+                        help=f'Bootstrap resamples per pattern (default: {DEFAULT_N_RESAMPLES})')
+    parser.add_argument('--confidence', type=float, default=DEFAULT_CONFIDENCE,
+                        help=f'Confidence level (default: {DEFAULT_CONFIDENCE})')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of worker processes (default: CPU count)')
+    args = parser.parse_args()
+
+    symbols = list(BOOTSTRAP_INPUTS.keys()) if 'all' in args.symbols else args.symbols
+    export_pattern_bootstrap(output_dir=args.output_dir, symbols=symbols, n_resamples=args.resamples,
+                             confidence=args.confidence, max_workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Refresh DAG - Dependency-Aware Pipeline Runner with Input Fingerprints
+Stages re-run only when their inputs or parameters changed; independent
+stages run concurrently
+Version 1.0
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from typing import Optional, Dict, List, Callable, Any
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# ==================== Configuration ====================
+STATE_FILE = '.refresh_state.json'
+DEFAULT_MAX_WORKERS = 4
+# ========================================================
+
+
+def digest_value(value: Any) -> str:
+    """Content fingerprint of a stage result (DataFrames hashed by content, not identity)"""
+    h = hashlib.sha256()
+    if isinstance(value, pd.DataFrame):
+        h.update(json.dumps([str(c) for c in value.columns]).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, dict) and all(isinstance(v, pd.DataFrame) for v in value.values()):
+        for key in sorted(value):
+            h.update(str(key).encode())
+            h.update(digest_value(value[key]).encode())
+    else:
+        h.update(json.dumps(value, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+def digest_files(paths: List[str]) -> str:
+    """Fingerprint of file contents (missing files hash as missing)"""
+    h = hashlib.sha256()
+    for path in paths:
+        filepath = Path(path)
+        h.update(str(path).encode())
+        if filepath.exists():
+            with open(filepath, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    h.update(chunk)
+        else:
+            h.update(b'<missing>')
+    return h.hexdigest()
+
+
+class Stage:
+    def __init__(self, name: str, func: Callable[[Dict[str, Any]], Any], deps: List[str] = None,
+                 params: Dict = None, outputs: List[str] = None, volatile: bool = False,
+                 resource: str = None, load: Callable[[], Any] = None):
+        """
+        One node of the refresh DAG
+
+        Args:
+            name: Unique stage name (e.g. 'indicators:gc1')
+            func: Called with {dep name: dep value}; returns the stage value (None = failed)
+            deps: Names of upstream stages
+            params: Parameters that change the result (part of the fingerprint)
+            outputs: Files the stage writes; a stage is only skipped if they still hold
+                what it wrote last time
+            volatile: Always run (e.g. fetching from TradingView)
+            resource: Stages sharing a resource never run at the same time
+            load: Rebuild the value from outputs when a skipped stage is needed downstream
+        """
+        self.name = name
+        self.func = func
+        self.deps = deps or []
+        self.params = params or {}
+        self.outputs = outputs or []
+        self.volatile = volatile
+        self.resource = resource
+        self.load = load
+
+
+class RefreshDAG:
+    def __init__(self, state_file: str = STATE_FILE, max_workers: int = DEFAULT_MAX_WORKERS,
+                 force: bool = False):
+        """
+        Runs stages in dependency order, skipping those whose fingerprint is unchanged
+
+        A stage's fingerprint is the hash of its name, params and the output
+        digests of its upstream stages. When it matches the previous run and its
+        output files are unchanged since that run, the stage is skipped and its
+        previous digest is reused, so everything downstream can be skipped as well.
+
+        Args:
+            state_file: JSON file holding fingerprints from the previous run
+            max_workers: Thread pool size for independent stages
+            force: Ignore previous fingerprints and run everything
+        """
+        self.stages: Dict[str, Stage] = {}
+        self.state_file = Path(state_file)
+        self.max_workers = max_workers
+        self.force = force
+
+        self._values: Dict[str, Any] = {}
+        self._digests: Dict[str, str] = {}
+        self._status: Dict[str, str] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._stage_locks: Dict[str, threading.Lock] = {}
+        self._state_lock = threading.Lock()
+        self._state: Dict[str, Dict] = {}
+
+    def add(self, stage: Stage) -> Stage:
+        if stage.name in self.stages:
+            raise ValueError(f"Duplicate stage: {stage.name}")
+        self.stages[stage.name] = stage
+        self._stage_locks[stage.name] = threading.Lock()
+        if stage.resource:
+            self._locks.setdefault(stage.resource, threading.Lock())
+        return stage
+
+    # ---------- State ----------
+
+    def _load_state(self):
+        self._state = {}
+        if self.state_file.exists() and not self.force:
+            try:
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    self._state = json.load(f)
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable refresh state {self.state_file}: {e}")
+
+    def _save_state(self):
+        try:
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.state_file.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._state, f, indent=2)
+            tmp_path.replace(self.state_file)
+        except Exception as e:
+            logger.error(f"Error saving refresh state to {self.state_file}: {e}")
+
+    # ---------- Execution ----------
+
+    def _fingerprint(self, stage: Stage) -> str:
+        payload = {
+            'name': stage.name,
+            'params': stage.params,
+            'deps': {dep: self._digests[dep] for dep in stage.deps}
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _value(self, name: str) -> Any:
+        """Value of a finished stage, loading or recomputing it if the stage was skipped"""
+        stage = self.stages[name]
+        with self._stage_locks[name]:
+            if name not in self._values:
+                if stage.load is not None:
+                    self._values[name] = stage.load()
+                else:
+                    logger.info(f"[{name}] recomputing skipped stage for downstream use")
+                    self._values[name] = self._call(stage)
+            return self._values[name]
+
+    def _call(self, stage: Stage) -> Any:
+        inputs = {dep: self._value(dep) for dep in stage.deps}
+        if stage.resource:
+            with self._locks[stage.resource]:
+                return stage.func(inputs)
+        return stage.func(inputs)
+
+    def _execute(self, name: str) -> str:
+        stage = self.stages[name]
+
+        failed_deps = [dep for dep in stage.deps if self._status.get(dep) == 'failed']
+        if failed_deps:
+            logger.warning(f"[{name}] not run: upstream failed ({', '.join(failed_deps)})")
+            return 'failed'
+
+        fingerprint = self._fingerprint(stage)
+        previous = self._state.get(name, {})
+        # Outputs edited outside the DAG (e.g. by bulk_ingest.py) force a re-run
+        outputs_intact = (all(Path(path).exists() for path in stage.outputs)
+                          and previous.get('outputs') == digest_files(stage.outputs))
+        if not stage.volatile and previous.get('fingerprint') == fingerprint and outputs_intact:
+            self._digests[name] = previous['digest']
+            return 'skipped'
+
+        started = time.perf_counter()
+        try:
+            value = self._call(stage)
+        except Exception as e:
+            logger.error(f"[{name}] stage error: {e}")
+            value = None
+
+        if value is None:
+            return 'failed'
+
+        with self._stage_locks[name]:
+            self._values[name] = value
+        digest = digest_value(value)
+        self._digests[name] = digest
+        with self._state_lock:
+            self._state[name] = {'fingerprint': fingerprint, 'digest': digest,
+                                 'outputs': digest_files(stage.outputs)}
+
+        unchanged = previous.get('digest') == digest
+        logger.info(f"[{name}] ran in {time.perf_counter() - started:.2f}s"
+                    f"{' (output unchanged)' if unchanged else ''}")
+        return 'ran'
+
+    def _check_graph(self):
+        for stage in self.stages.values():
+            missing = [dep for dep in stage.deps if dep not in self.stages]
+            if missing:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages: {missing}")
+
+        visiting, done = set(), set()
+
+        def visit(name: str):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Cycle detected at stage {name}")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def run(self) -> Dict[str, str]:
+        """
+        Run the DAG
+
+        Returns:
+            Dictionary mapping stage names to 'ran', 'skipped' or 'failed'
+        """
+        self._check_graph()
+        self._load_state()
+        self._values, self._digests, self._status = {}, {}, {}
+
+        pending = {name: set(stage.deps) for name, stage in self.stages.items()}
+        running = {}
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                ready = [name for name, deps in pending.items() if not deps]
+                for name in ready:
+                    del pending[name]
+                    running[executor.submit(self._execute, name)] = name
+
+                if not running:
+                    break
+
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    self._status[name] = future.result()
+                    for deps in pending.values():
+                        deps.discard(name)
+
+        self._save_state()
+
+        counts = {status: list(self._status.values()).count(status) for status in ['ran', 'skipped', 'failed']}
+        logger.info(f"Refresh finished in {time.perf_counter() - started:.2f}s: "
+                    f"{counts['ran']} ran, {counts['skipped']} skipped, {counts['failed']} failed")
+        return dict(self._status)
+
+    def value(self, name: str) -> Optional[Any]:
+        """Result of a stage after run() (loaded from outputs if the stage was skipped)"""
+        if self._status.get(name) in (None, 'failed'):
+            return None
+        return self._value(name)
@@ -154,6 +154,73 @@ async function loadAllMarketsData() {
     return results;
 }
 
+// Load multi-resolution chart levels (built by chart_decimation.py)
+const chartLevelCache = {};
+
+async function loadChartLevels(seriesId = null) {
+    const series = seriesId || currentMarket;
+    if (chartLevelCache[series]) {
+        return chartLevelCache[series];
+    }
+
+    const file = MARKETS[series] ? MARKETS[series].dataFile.replace('_data.csv', '_chart.json') : `${series}_chart.json`;
+    try {
+        const response = await fetch(file);
+        if (!response.ok) return null;
+        chartLevelCache[series] = await response.json();
+        return chartLevelCache[series];
+    } catch (error) {
+        console.warn(`Chart levels not available for ${series}:`, error);
+        return null;
+    }
+}
+
+// Load the precomputed XAUUSD / GC1! comparison (built by correlation_engine.py)
+const COMPARISON_STATS_FILE = 'comparison_stats.json';
+const COMPARISON_ROLLING_FILE = 'comparison_rolling.csv';
+
+async function loadComparisonExports(data1, data2) {
+    try {
+        const response = await fetch(COMPARISON_STATS_FILE);
+        if (!response.ok) return null;
+        const summary = await response.json();
+
+        // Only use exports built from the same daily files the page loaded
+        const last1 = data1.length ? data1[data1.length - 1].datetime : null;
+        const last2 = data2.length ? data2[data2.length - 1].datetime : null;
+        const lastCommon = last1 < last2 ? last1 : last2;
+        if (summary.lastDate !== lastCommon || summary.avgRange === undefined) return null;
+
+        const rolling = await new Promise((resolve, reject) => {
+            Papa.parse(COMPARISON_ROLLING_FILE, {
+                download: true,
+                header: true,
+                dynamicTyping: true,
+                skipEmptyLines: true,
+                complete: results => resolve(results.data),
+                error: reject
+            });
+        });
+        if (!rolling.length || rolling[rolling.length - 1].date !== summary.lastDate) return null;
+
+        return { summary, rolling };
+    } catch (error) {
+        console.warn('Comparison exports not available:', error);
+        return null;
+    }
+}
+
+// Pick the level to draw for a zoom range: null = raw rows already fit in maxPoints
+function selectChartLevel(chartData, visibleBars, maxPoints) {
+    if (!chartData || !chartData.levels || chartData.levels.length === 0) return null;
+    if (visibleBars <= maxPoints) return null;
+
+    for (const level of chartData.levels) {
+        if (Math.ceil(visibleBars / level.bucket) <= maxPoints) return level;
+    }
+    return chartData.levels[chartData.levels.length - 1];
+}
+
 // Clear cache for a market
 function clearCache(marketId = null) {
     if (marketId) {
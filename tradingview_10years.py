@@ -76,10 +76,25 @@ SYMBOLS_H1 = {
         'n_bars': 5000  # ~7 months of hourly data (5000/24 = 208 days)
     }
 }
+
+# Human-readable candle type names (10 types)
+CANDLE_TYPE_NAMES = {
+    0: 'Doji Bullish',
+    1: 'Doji Bearish',
+    2: 'Full Body Bullish',
+    3: 'Full Body Bearish',
+    4: 'Normal Candle Bullish',
+    5: 'Normal Candle Bearish',
+    6: 'Long Upper Wick Bullish',
+    7: 'Long Upper Wick Bearish',
+    8: 'Long Lower Wick Bullish',
+    9: 'Long Lower Wick Bearish'
+}
 # ========================================================
 
 class TradingView10YearsFetcher:
-    def __init__(self, username: str = None, password: str = None, timezone: str = 'Asia/Bangkok'):
+    def __init__(self, username: str = None, password: str = None, timezone: str = 'Asia/Bangkok',
+                 history_dir: str = None):
         """
         Initialize TradingView fetcher with improved credential handling
         Configured for 10 years of historical data
@@ -88,6 +103,7 @@ class TradingView10YearsFetcher:
             username: TradingView username (optional, will check .env)
             password: TradingView password (optional, will check .env)
             timezone: Target timezone for data (default: Asia/Bangkok)
+            history_dir: Directory for the append-only bar revision log (optional)
         """
         # Load environment variables
         env_path = Path('.env')
@@ -117,6 +133,7 @@ class TradingView10YearsFetcher:
 
         self.tv = None
         self._connection_verified = False
+        self.history_dir = history_dir
 
     def _get_credential(self, cred_type: str, provided_value: str, env_var: str) -> str:
         """Safely get credentials with proper fallback handling"""
@@ -199,6 +216,7 @@ class TradingView10YearsFetcher:
                 logger.info(f"Successfully fetched {len(data)} bars of data for {symbol}")
                 # Basic data validation
                 if self._validate_ohlcv_data(data):
+                    self._record_bar_history(data, symbol, exchange, interval)
                     return data
                 else:
                     logger.error("Data validation failed")
@@ -211,6 +229,31 @@ class TradingView10YearsFetcher:
             logger.error(f"Error fetching data for {symbol}: {e}")
             return None
 
+    def _record_bar_history(self, data: pd.DataFrame, symbol: str, exchange: str, interval) -> bool:
+        """
+        Append fetched bars to the revision log (inserts and revisions only)
+
+        The log is an optional audit trail: any failure is logged as a warning
+        and never affects the fetched data.
+        """
+        if not self.history_dir:
+            return False
+
+        try:
+            from bar_history import BarRevisionLog, series_name
+
+            interval_name = getattr(interval, 'value', str(interval))
+            log = BarRevisionLog(str(Path(self.history_dir) / series_name(symbol, exchange, interval_name)),
+                                 timezone=str(self.timezone))
+            if log.record(data) < 0:
+                logger.warning(f"Bar history not recorded for {symbol}")
+                return False
+            return True
+
+        except Exception as e:
+            logger.warning(f"Bar history not recorded for {symbol}: {e}")
+            return False
+
     def calculate_indicators(self, data: pd.DataFrame) -> Optional[pd.DataFrame]:
         """
         Calculate technical indicators using TA-Lib with comprehensive error handling
@@ -264,7 +307,7 @@ class TradingView10YearsFetcher:
             df['MACD_hist'] = macd_hist
 
             # Calculate Bollinger Bands
-            bb_upper, bb_middle, bb_lower = talib.BBANDS(df['close'].values)
+            bb_upper, bb_middle, bb_lower = talib.BBANDS(df['close'].values, timeperiod=5)
             df['BB_upper'] = bb_upper
             df['BB_middle'] = bb_middle
             df['BB_lower'] = bb_lower
@@ -295,19 +338,7 @@ class TradingView10YearsFetcher:
             df['candle_type'] = df.apply(self.classify_candle_type, axis=1)
 
             # Add human-readable names (10 types)
-            candle_type_names = {
-                0: 'Doji Bullish',
-                1: 'Doji Bearish',
-                2: 'Full Body Bullish',
-                3: 'Full Body Bearish',
-                4: 'Normal Candle Bullish',
-                5: 'Normal Candle Bearish',
-                6: 'Long Upper Wick Bullish',
-                7: 'Long Upper Wick Bearish',
-                8: 'Long Lower Wick Bullish',
-                9: 'Long Lower Wick Bearish'
-            }
-            df['candle_type_name'] = df['candle_type'].map(candle_type_names)
+            df['candle_type_name'] = df['candle_type'].map(CANDLE_TYPE_NAMES)
 
             # Calculate previous candle types (last 3 days)
             df['prev_candle_1'] = df['candle_type'].shift(1)
@@ -321,6 +352,60 @@ class TradingView10YearsFetcher:
             logger.error(f"Unexpected error calculating indicators: {e}")
             return None
 
+    def calculate_indicators_panel(self, datasets: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """
+        Calculate the calculate_indicators columns for many symbols in one batch
+
+        OHLC of all symbols is packed into (symbols x time) arrays and every
+        indicator is computed once for the whole panel, then split back into
+        per-symbol frames with the same columns as calculate_indicators.
+
+        Args:
+            datasets: Mapping of symbol key to DataFrame with OHLCV data
+
+        Returns:
+            Dictionary mapping symbol keys to DataFrames with indicators added
+        """
+        from panel_indicators import calculate_panel
+
+        min_periods = 26  # Largest period we use
+        valid = {}
+        for symbol_key, data in datasets.items():
+            if data is None or data.empty:
+                logger.error(f"No data provided for indicator calculation ({symbol_key})")
+            elif len(data) < min_periods:
+                logger.error(f"Insufficient data for indicators ({symbol_key}): {len(data)} < {min_periods}")
+            else:
+                valid[symbol_key] = data
+
+        if not valid:
+            return {}
+
+        try:
+            logger.info(f"Calculating technical indicators (panel mode, {len(valid)} symbols)...")
+            panel = calculate_panel(valid)
+            if panel is None:
+                return {}
+
+            results = {}
+            for symbol_key, columns in panel.items():
+                df = valid[symbol_key].copy()
+                for name, values in columns.items():
+                    df[name] = values
+
+                df['candle_type_name'] = df['candle_type'].map(CANDLE_TYPE_NAMES)
+                df['prev_candle_1'] = df['candle_type'].shift(1)
+                df['prev_candle_2'] = df['candle_type'].shift(2)
+                df['prev_candle_3'] = df['candle_type'].shift(3)
+                results[symbol_key] = df
+
+            logger.info("Technical indicators calculated successfully!")
+            return results
+
+        except Exception as e:
+            logger.error(f"Unexpected error calculating panel indicators: {e}")
+            return {}
+
     def _validate_ohlcv_data(self, data: pd.DataFrame) -> bool:
         """Validate OHLCV data for common issues"""
         required_columns = ['open', 'high', 'low', 'close']
@@ -680,6 +765,55 @@ class TradingView10YearsFetcher:
         return results
 
 
+def save_h1_data(data: pd.DataFrame, symbol_key: str, output_dir: str = None) -> Optional[pd.DataFrame]:
+    """
+    Format fetched H1 bars and save them to the symbol's H1 CSV
+
+    Args:
+        data: Raw H1 data from fetch_data
+        symbol_key: Key from SYMBOLS_H1
+        output_dir: Directory to save output files
+
+    Returns:
+        Saved DataFrame or None if failed
+    """
+    config = SYMBOLS_H1[symbol_key]
+    output_file = config['output_file']
+    if output_dir:
+        output_file = str(Path(output_dir) / output_file)
+
+    if data is None or data.empty:
+        logger.warning(f"No H1 data received for {config['symbol']}")
+        return None
+
+    try:
+        # Reset index and format
+        df = data.reset_index()
+
+        # Rename columns if needed
+        if 'datetime' not in df.columns and df.index.name == 'datetime':
+            df = df.reset_index()
+
+        # Format datetime
+        if 'datetime' in df.columns:
+            df['datetime'] = pd.to_datetime(df['datetime']).dt.strftime('%Y-%m-%d %H:%M:%S')
+
+        # Add symbol column
+        df['symbol'] = f"{config['exchange']}:{config['symbol']}"
+
+        # Save to CSV
+        filepath = Path(output_file)
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(filepath, index=False, encoding='utf-8')
+
+        logger.info(f"Saved {len(df)} H1 bars to {filepath}")
+        return df
+
+    except Exception as e:
+        logger.error(f"Error saving H1 data for {config['symbol']}: {e}")
+        return None
+
+
 def fetch_h1_data_for_basis(fetcher: TradingView10YearsFetcher, output_dir: str = None) -> Dict[str, pd.DataFrame]:
     """
     Fetch H1 (hourly) data for basis calculation & session analysis
@@ -701,12 +835,7 @@ def fetch_h1_data_for_basis(fetcher: TradingView10YearsFetcher, output_dir: str
 
     for symbol_key, config in SYMBOLS_H1.items():
         symbol = config['symbol']
-        exchange = config['exchange']
         n_bars = config.get('n_bars', 100)
-        output_file = config['output_file']
-
-        if output_dir:
-            output_file = str(Path(output_dir) / output_file)
 
         logger.info(f"\nFetching {symbol} H1 data ({n_bars} bars)...")
 
@@ -714,39 +843,195 @@ def fetch_h1_data_for_basis(fetcher: TradingView10YearsFetcher, output_dir: str
             # Fetch H1 data
             data = fetcher.fetch_data(
                 symbol=symbol,
-                exchange=exchange,
+                exchange=config['exchange'],
                 interval=Interval.in_1_hour,
                 n_bars=n_bars
             )
 
-            if data is not None and not data.empty:
-                # Reset index and format
-                df = data.reset_index()
+            df = save_h1_data(data, symbol_key, output_dir)
+            if df is not None:
+                results[symbol_key] = df
 
-                # Rename columns if needed
-                if 'datetime' not in df.columns and df.index.name == 'datetime':
-                    df = df.reset_index()
+        except Exception as e:
+            logger.error(f"Error fetching H1 data for {symbol}: {e}")
 
-                # Format datetime
-                if 'datetime' in df.columns:
-                    df['datetime'] = pd.to_datetime(df['datetime']).dt.strftime('%Y-%m-%d %H:%M:%S')
+    return results
 
-                # Add symbol column
-                df['symbol'] = f"{exchange}:{symbol}"
 
-                # Save to CSV
-                filepath = Path(output_file)
-                df.to_csv(filepath, index=False, encoding='utf-8')
+def build_refresh_dag(fetcher: TradingView10YearsFetcher, symbols: List[str], output_dir: str = None,
+                      start_date: str = None, end_date: str = None, panel: bool = False,
+                      bootstrap: bool = False, correlation: bool = False, charts: bool = False,
+                      volume_profile: bool = False, force: bool = False):
+    """
+    Model the full refresh as a DAG of fingerprinted stages
 
-                logger.info(f"Saved {len(df)} H1 bars to {filepath}")
-                results[symbol_key] = df
-            else:
-                logger.warning(f"No H1 data received for {symbol}")
+    Stages: fetch -> indicators -> filter -> save per symbol, H1 fetch -> save,
+    a summary, and the optional derived artifacts. Fetches always run, one at
+    a time because they share the TradingView connection. Every other stage is
+    skipped when its inputs and parameters match the previous run, so a refresh
+    after a no-op fetch only costs the fetches.
 
-        except Exception as e:
-            logger.error(f"Error fetching H1 data for {symbol}: {e}")
+    Args:
+        fetcher: TradingView10YearsFetcher instance
+        symbols: Symbol keys to refresh
+        output_dir: Directory for output files (and the refresh state)
+        start_date: Start date for filtering (YYYY-MM-DD)
+        end_date: End date for filtering (YYYY-MM-DD)
+        panel: Compute indicators for all symbols in one panel stage
+        bootstrap: Add the pattern bootstrap CI stage
+        correlation: Add the rolling XAUUSD/GC1! comparison stage
+        charts: Add the multi-resolution chart stage
+        volume_profile: Add the strike-grid volume profile stage
+        force: Ignore previous fingerprints and run every stage
 
-    return results
+    Returns:
+        RefreshDAG ready to run
+    """
+    from refresh_dag import STATE_FILE, RefreshDAG, Stage, digest_files
+
+    base_dir = Path(output_dir) if output_dir else Path('.')
+    dag = RefreshDAG(state_file=str(base_dir / STATE_FILE), force=force)
+
+    # filter_data_by_date depends on the clock (10-year window, today's incomplete candle)
+    filter_params = {
+        'start_date': start_date or START_DATE_10_YEARS,
+        'end_date': end_date,
+        'today': datetime.now(fetcher.timezone).strftime('%Y-%m-%d'),
+        'timezone': str(fetcher.timezone)
+    }
+
+    def output_path(filename: str) -> str:
+        return str(base_dir / filename)
+
+    for symbol_key in symbols:
+        config = SYMBOLS[symbol_key]
+        dag.add(Stage(
+            f'fetch:{symbol_key}',
+            lambda _, c=config: fetcher.fetch_data(symbol=c['symbol'], exchange=c['exchange']),
+            params={'symbol': config['symbol'], 'exchange': config['exchange'], 'n_bars': DEFAULT_N_BARS},
+            volatile=True, resource='tradingview'
+        ))
+
+    if panel:
+        dag.add(Stage(
+            'indicators:panel',
+            lambda inputs: fetcher.calculate_indicators_panel(
+                {name.split(':', 1)[1]: value for name, value in inputs.items()}) or None,
+            deps=[f'fetch:{symbol_key}' for symbol_key in symbols],
+            params={'mode': 'panel'}
+        ))
+
+    for symbol_key in symbols:
+        output_file = output_path(SYMBOLS[symbol_key]['output_file'])
+
+        if panel:
+            indicators_stage = 'indicators:panel'
+            dag.add(Stage(
+                f'indicators:{symbol_key}',
+                lambda inputs, k=symbol_key: inputs['indicators:panel'].get(k),
+                deps=[indicators_stage]
+            ))
+        else:
+            dag.add(Stage(
+                f'indicators:{symbol_key}',
+                lambda inputs, k=symbol_key: fetcher.calculate_indicators(inputs[f'fetch:{k}']),
+                deps=[f'fetch:{symbol_key}']
+            ))
+
+        dag.add(Stage(
+            f'filter:{symbol_key}',
+            lambda inputs, k=symbol_key: fetcher.filter_data_by_date(
+                inputs[f'indicators:{k}'], filter_params['start_date'], filter_params['end_date']),
+            deps=[f'indicators:{symbol_key}'],
+            params=filter_params
+        ))
+
+        dag.add(Stage(
+            f'save:{symbol_key}',
+            lambda inputs, k=symbol_key, f=output_file: (
+                inputs[f'filter:{k}'] if fetcher.save_to_csv(inputs[f'filter:{k}'], f) else None),
+            deps=[f'filter:{symbol_key}'],
+            params={'output_file': output_file},
+            outputs=[output_file],
+            load=lambda f=output_file: pd.read_csv(f)
+        ))
+
+    save_stages = [f'save:{symbol_key}' for symbol_key in symbols]
+    dag.add(Stage(
+        'summary',
+        lambda inputs: print_summary({name.split(':', 1)[1]: value for name, value in inputs.items()}) or True,
+        deps=save_stages,
+        volatile=True
+    ))
+
+    h1_save_stages = []
+    for symbol_key, config in SYMBOLS_H1.items():
+        output_file = output_path(config['output_file'])
+        dag.add(Stage(
+            f'h1_fetch:{symbol_key}',
+            lambda _, c=config: fetcher.fetch_data(symbol=c['symbol'], exchange=c['exchange'],
+                                                   interval=Interval.in_1_hour, n_bars=c.get('n_bars', 100)),
+            params={'symbol': config['symbol'], 'exchange': config['exchange'], 'n_bars': config.get('n_bars', 100)},
+            volatile=True, resource='tradingview'
+        ))
+        dag.add(Stage(
+            f'h1_save:{symbol_key}',
+            lambda inputs, k=symbol_key: save_h1_data(inputs[f'h1_fetch:{k}'], k, output_dir),
+            deps=[f'h1_fetch:{symbol_key}'],
+            params={'output_file': output_file},
+            outputs=[output_file],
+            load=lambda f=output_file: pd.read_csv(f)
+        ))
+        h1_save_stages.append(f'h1_save:{symbol_key}')
+
+    if bootstrap:
+        from pattern_bootstrap import BOOTSTRAP_INPUTS, DEFAULT_N_RESAMPLES, export_pattern_bootstrap
+        outputs = [output_path(BOOTSTRAP_INPUTS[k]['output_file']) for k in symbols if k in BOOTSTRAP_INPUTS]
+        dag.add(Stage(
+            'bootstrap',
+            lambda _, o=outputs: (bool(export_pattern_bootstrap(output_dir=output_dir, symbols=symbols))
+                                   and digest_files(o)) or None,
+            deps=save_stages,
+            params={'resamples': DEFAULT_N_RESAMPLES},
+            outputs=outputs
+        ))
+
+    if correlation and 'xauusd' in symbols and 'gc1' in symbols:
+        from correlation_engine import COMPARISON_FILES, ROLLING_WINDOWS, export_comparison
+        outputs = [output_path(COMPARISON_FILES['rolling']), output_path(COMPARISON_FILES['summary'])]
+        dag.add(Stage(
+            'correlation',
+            lambda _, o=outputs: (export_comparison(output_dir=output_dir) is not None and digest_files(o)) or None,
+            deps=['save:xauusd', 'save:gc1'],
+            params={'windows': ROLLING_WINDOWS},
+            outputs=outputs
+        ))
+
+    if charts:
+        from chart_decimation import CHART_INPUTS, export_chart_levels
+        series = [k for k in symbols if k in CHART_INPUTS] + [k for k in SYMBOLS_H1 if k in CHART_INPUTS]
+        outputs = [output_path(CHART_INPUTS[k]['output_file']) for k in series]
+        dag.add(Stage(
+            'charts',
+            lambda _, o=outputs: (bool(export_chart_levels(output_dir=output_dir, series=series))
+                                   and digest_files(o)) or None,
+            deps=save_stages + h1_save_stages,
+            params={'series': series},
+            outputs=outputs
+        ))
+
+    if volume_profile:
+        from volume_profile import PROFILE_INPUTS, PROFILE_WINDOWS, export_volume_profile
+        outputs = [output_path(config['output_file']) for config in PROFILE_INPUTS.values()]
+        dag.add(Stage(
+            'volume_profile',
+            lambda _, o=outputs: (bool(export_volume_profile(output_dir=output_dir)) and digest_files(o)) or None,
+            deps=h1_save_stages,
+            params={'windows': PROFILE_WINDOWS},
+            outputs=outputs
+        ))
+
+    return dag
 
 
 def print_summary(results: Dict[str, pd.DataFrame]):
@@ -816,6 +1101,20 @@ def main():
                         default=['all'], help='Symbols to fetch (default: all)')
     parser.add_argument('--output-dir', type=str, default=None,
                         help='Output directory for CSV files')
+    parser.add_argument('--history-dir', type=str, default=None,
+                        help='Record fetched bars in an append-only revision log in this directory')
+    parser.add_argument('--panel', action='store_true',
+                        help='Compute indicators for all symbols in one batch (panel mode)')
+    parser.add_argument('--correlation', action='store_true',
+                        help='Update rolling XAUUSD/GC1! correlation and divergence series')
+    parser.add_argument('--charts', action='store_true',
+                        help='Build multi-resolution chart series for the daily and H1 files')
+    parser.add_argument('--volume-profile', action='store_true',
+                        help='Bin H1 volume into strike-grid volume profiles for the CME OI page')
+    parser.add_argument('--force', action='store_true',
+                        help='Re-run every stage even if its inputs are unchanged')
+    parser.add_argument('--bootstrap', action='store_true',
+                        help='Compute bootstrap CIs for pattern predictions after saving daily data')
     args = parser.parse_args()
 
     # Parse symbols
@@ -831,27 +1130,26 @@ def main():
 
     try:
         # Create fetcher instance
-        fetcher = TradingView10YearsFetcher()
+        fetcher = TradingView10YearsFetcher(history_dir=args.history_dir)
 
-        # Run analysis for selected symbols
-        results = fetcher.run_full_analysis(
+        # Run the refresh DAG (unchanged stages are skipped)
+        dag = build_refresh_dag(
+            fetcher,
             symbols=symbols,
-            save_csv=True,
-            output_dir=args.output_dir
+            output_dir=args.output_dir,
+            panel=args.panel,
+            bootstrap=args.bootstrap,
+            correlation=args.correlation,
+            charts=args.charts,
+            volume_profile=args.volume_profile,
+            force=args.force
         )
+        status = dag.run()
 
-        if results:
-            print_summary(results)
-
-            # Also fetch H1 data for basis calculation
-            logger.info("\n" + "="*70)
-            logger.info("Fetching H1 data for Basis calculation...")
-            logger.info("="*70)
-            h1_results = fetch_h1_data_for_basis(fetcher, output_dir=args.output_dir)
-
-            if h1_results:
-                logger.info(f"\nH1 data fetched for {len(h1_results)} symbols")
-                for key, df in h1_results.items():
+        if any(status.get(f'save:{symbol_key}') in ('ran', 'skipped') for symbol_key in symbols):
+            for key in SYMBOLS_H1:
+                df = dag.value(f'h1_save:{key}')
+                if df is not None:
                     logger.info(f"  - {SYMBOLS_H1[key]['output_file']}: {len(df)} bars")
 
             logger.info("\nANALYSIS COMPLETE!")
@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+Trigger Engine - Price-Level Alerts and Trade-Plan Triggers over H1 Bars
+Thousands of levels per symbol in an interval tree; each bar's high/low
+range is matched in O(log n + hits) and hits are emitted as events
+Version 1.0
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Optional, Dict, List, Iterator
+
+import numpy as np
+import pandas as pd
+
+from bar_store import BarStore
+
+logger = logging.getLogger(__name__)
+
+# ==================== Configuration ====================
+ENTRY_ZONE_WIDTH = 10  # Same offsets as calculateTradeSetup in daily-plan.js
+STOP_OFFSET = 10
+TP1_OFFSET = 10
+TP2_OFFSET = 20
+STRIKE_STEP = 25  # 00 / 25 / 50 / 75 grid (generateGCStrikeGrid in cme-oi.js)
+
+REPLAY_FILES = {
+    'xauusd': 'xauusd_h1_data.csv',
+    'gc1': 'gc1_h1_data.csv'
+}
+DAILY_FILES = {
+    'xauusd': 'xauusd_10years_data.csv',
+    'gc1': 'gc1_10years_data.csv'
+}
+EVENTS_FILE = 'trigger_events.csv'
+DEFAULT_PLAN_PERIOD = 365  # Daily rows averaged for plan distances (predictionPeriodSelect default)
+# ========================================================
+
+
+# ==================== Level helpers ====================
+
+def avg_distance_by_type(data: pd.DataFrame) -> Dict[int, Dict[str, float]]:
+    """Average candle distances per candle_type (calculateAvgDistanceByType in daily-plan.js)"""
+    columns = ['high_open_dist', 'upper_wick', 'body_size', 'lower_wick', 'open_low_dist']
+    grouped = data.groupby('candle_type')[columns].mean()
+    return {int(t): {col: float(grouped.loc[t, col]) for col in columns} for t in grouped.index}
+
+
+def trade_setup(open_price: float, predicted_type: int, avg_distances: Dict[int, Dict[str, float]]) -> Dict:
+    """Entry zone / SL / TP levels for a predicted candle type (calculateTradeSetup in daily-plan.js)"""
+    metrics = avg_distances[predicted_type]
+    is_bullish = predicted_type % 2 == 0
+
+    if is_bullish:
+        entry = open_price - metrics['open_low_dist']
+        entry_low, entry_high = entry - ENTRY_ZONE_WIDTH, entry
+        sl = entry_low - STOP_OFFSET
+        tp1, tp2 = entry + TP1_OFFSET, entry + TP2_OFFSET
+    else:
+        entry = open_price + metrics['high_open_dist']
+        entry_low, entry_high = entry, entry + ENTRY_ZONE_WIDTH
+        sl = entry_high + STOP_OFFSET
+        tp1, tp2 = entry - TP1_OFFSET, entry - TP2_OFFSET
+
+    return {
+        'isBullish': is_bullish,
+        'entry': entry,
+        'entryLow': entry_low,
+        'entryHigh': entry_high,
+        'sl': sl,
+        'tp1': tp1,
+        'tp2': tp2
+    }
+
+
+def gc_strike_grid(center_price: float, price_range: float = 200) -> List[float]:
+    """00/25/50/75 strikes within +/- price_range (generateGCStrikeGrid in cme-oi.js)"""
+    base_start = np.floor((center_price - price_range) / 100) * 100
+    base_end = np.ceil((center_price + price_range) / 100) * 100
+    strikes = np.arange(base_start, base_end + 100, STRIKE_STEP)
+    return [float(s) for s in strikes if center_price - price_range <= s <= center_price + price_range]
+
+
+# ==================== Interval index ====================
+
+class _Node:
+    __slots__ = ('center', 'ids_by_low', 'lows', 'ids_by_high', 'highs', 'left', 'right')
+
+
+def _build_tree(ids: np.ndarray, lows: np.ndarray, highs: np.ndarray) -> Optional[_Node]:
+    """Centered interval tree; each node keeps its intervals sorted by low and by high"""
+    if len(ids) == 0:
+        return None
+
+    node = _Node()
+    node.center = float(np.median((lows + highs) / 2))
+    left = highs < node.center
+    right = lows > node.center
+    mid = ~(left | right)
+
+    mid_ids, mid_lows, mid_highs = ids[mid], lows[mid], highs[mid]
+    order = np.argsort(mid_lows, kind='stable')
+    node.ids_by_low, node.lows = mid_ids[order], mid_lows[order]
+    order = np.argsort(mid_highs, kind='stable')
+    node.ids_by_high, node.highs = mid_ids[order], mid_highs[order]
+
+    node.left = _build_tree(ids[left], lows[left], highs[left])
+    node.right = _build_tree(ids[right], lows[right], highs[right])
+    return node
+
+
+class IntervalIndex:
+    """Static interval tree over [low, high] levels, rebuilt lazily after additions"""
+
+    def __init__(self):
+        self._ids: List[int] = []
+        self._lows: List[float] = []
+        self._highs: List[float] = []
+        self._root: Optional[_Node] = None
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, level_id: int, low: float, high: float):
+        self._ids.append(level_id)
+        self._lows.append(min(low, high))
+        self._highs.append(max(low, high))
+        self._dirty = True
+
+    def remove(self, level_ids: set):
+        """Drop retired levels (applied on the next rebuild)"""
+        keep = [i for i, level_id in enumerate(self._ids) if level_id not in level_ids]
+        self._ids = [self._ids[i] for i in keep]
+        self._lows = [self._lows[i] for i in keep]
+        self._highs = [self._highs[i] for i in keep]
+        self._dirty = True
+
+    def _rebuild(self):
+        self._root = _build_tree(np.array(self._ids, dtype=np.int64),
+                                 np.array(self._lows, dtype=np.float64),
+                                 np.array(self._highs, dtype=np.float64))
+        self._dirty = False
+
+    def overlapping(self, low: float, high: float) -> np.ndarray:
+        """Ids of all levels whose [low, high] overlaps the query range"""
+        if self._dirty:
+            self._rebuild()
+
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            if high < node.center:
+                found.append(node.ids_by_low[:np.searchsorted(node.lows, high, side='right')])
+                stack.append(node.left)
+            elif low > node.center:
+                found.append(node.ids_by_high[np.searchsorted(node.highs, low, side='left'):])
+                stack.append(node.right)
+            else:
+                found.append(node.ids_by_low)
+                stack.append(node.left)
+                stack.append(node.right)
+
+        return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+
+
+# ==================== Trigger engine ====================
+
+class TriggerEngine:
+    def __init__(self):
+        """
+        Watch price levels and trade plans per symbol against incoming bars
+
+        Levels are either one-shot (retired after the first hit) or persistent.
+        Persistent levels fire again only after at least one bar that did not
+        touch them, so a level price hovers around does not fire on every bar.
+        """
+        self.levels: Dict[int, Dict] = {}
+        self.plans: Dict[int, Dict] = {}
+        self.indexes: Dict[str, IntervalIndex] = {}
+        self._bar_seq: Dict[str, int] = {}
+        self._retired: Dict[str, set] = {}
+        self._next_id = 0
+
+    def _new_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    def add_level(self, symbol: str, low: float, high: float = None, kind: str = 'custom',
+                  owner: str = None, plan_id: int = None, once: bool = True, active: bool = True) -> int:
+        """
+        Register a price level (high=None) or zone [low, high]
+
+        Returns:
+            Level id
+        """
+        high = low if high is None else high
+        level_id = self._new_id()
+        self.levels[level_id] = {
+            'id': level_id,
+            'symbol': symbol,
+            'kind': kind,
+            'owner': owner,
+            'plan_id': plan_id,
+            'low': float(min(low, high)),
+            'high': float(max(low, high)),
+            'once': once,
+            'active': active,
+            'last_hit_seq': -2
+        }
+        self.indexes.setdefault(symbol, IntervalIndex()).add(level_id, low, high)
+        return level_id
+
+    def add_plan(self, symbol: str, setup: Dict, owner: str = None, label: str = None) -> int:
+        """
+        Register a trade plan from a trade_setup() result
+
+        Only the entry zone is armed at first; SL / TP1 / TP2 arm on the bar
+        after the entry fills.
+
+        Returns:
+            Plan id
+        """
+        plan_id = self._new_id()
+        plan = {'id': plan_id, 'symbol': symbol, 'owner': owner, 'label': label,
+                'isBullish': setup['isBullish'], 'state': 'pending', 'levels': {}}
+        self.plans[plan_id] = plan
+
+        plan['levels']['entry'] = self.add_level(symbol, setup['entryLow'], setup['entryHigh'], kind='entry',
+                                                 owner=owner, plan_id=plan_id)
+        for kind in ['sl', 'tp1', 'tp2']:
+            plan['levels'][kind] = self.add_level(symbol, setup[kind], kind=kind, owner=owner,
+                                                  plan_id=plan_id, active=False)
+        return plan_id
+
+    def add_strike_grid(self, symbol: str, center_price: float, price_range: float = 200,
+                        owner: str = None) -> List[int]:
+        """Register the 00/25/50/75 strike grid around a price as persistent levels"""
+        return [self.add_level(symbol, strike, kind='strike', owner=owner, once=False)
+                for strike in gc_strike_grid(center_price, price_range)]
+
+    def _retire(self, level_id: int):
+        level = self.levels[level_id]
+        level['active'] = False
+        self._retired.setdefault(level['symbol'], set()).add(level_id)
+
+    def _advance_plan(self, plan: Dict, hit_kinds: set, seq: int) -> Optional[str]:
+        """Plan state machine; SL wins when a single bar touches both SL and a TP"""
+        levels = plan['levels']
+        if plan['state'] == 'pending' and 'entry' in hit_kinds:
+            plan['state'] = 'open'
+            plan['armed_seq'] = seq + 1
+            return 'open'
+
+        if plan['state'] in ('open', 'tp1'):
+            if 'sl' in hit_kinds:
+                plan['state'] = 'stopped'
+            elif 'tp2' in hit_kinds:
+                plan['state'] = 'closed'
+            elif 'tp1' in hit_kinds and plan['state'] == 'open':
+                plan['state'] = 'tp1'
+                return 'tp1'
+            else:
+                return None
+            for level_id in levels.values():
+                if self.levels[level_id]['active']:
+                    self._retire(level_id)
+            return plan['state']
+
+        return None
+
+    def on_bar(self, symbol: str, bar_time, open_: float, high: float, low: float,
+               close: float) -> List[Dict]:
+        """
+        Match one bar's [low, high] range against the symbol's levels
+
+        Returns:
+            List of trigger events (one per level hit)
+        """
+        index = self.indexes.get(symbol)
+        if index is None:
+            return []
+
+        seq = self._bar_seq.get(symbol, -1) + 1
+        self._bar_seq[symbol] = seq
+
+        # Compact retired levels out of the tree once they pile up
+        retired = self._retired.get(symbol)
+        if retired and len(retired) * 4 > len(index):
+            index.remove(retired)
+            retired.clear()
+
+        events = []
+        plan_hits: Dict[int, set] = {}
+        for level_id in index.overlapping(low, high):
+            level = self.levels[int(level_id)]
+            if not level['active']:
+                continue
+
+            plan = self.plans.get(level['plan_id'])
+            if plan is not None and level['kind'] != 'entry' and seq < plan.get('armed_seq', seq + 1):
+                continue
+
+            fresh = level['last_hit_seq'] != seq - 1
+            level['last_hit_seq'] = seq
+            if not level['once'] and not fresh:
+                continue
+
+            events.append({
+                'time': bar_time,
+                'symbol': symbol,
+                'level_id': level['id'],
+                'kind': level['kind'],
+                'owner': level['owner'],
+                'plan_id': level['plan_id'],
+                'level_low': level['low'],
+                'level_high': level['high'],
+                'bar_open': open_,
+                'bar_high': high,
+                'bar_low': low,
+                'bar_close': close,
+                'plan_state': None,
+                'ambiguous': False
+            })
+            if level['once'] and plan is None:
+                self._retire(level['id'])
+            if plan is not None:
+                plan_hits.setdefault(plan['id'], set()).add(level['kind'])
+
+        for plan_id, kinds in plan_hits.items():
+            plan = self.plans[plan_id]
+            new_state = self._advance_plan(plan, kinds, seq)
+            if new_state == 'open':
+                self._retire(plan['levels']['entry'])
+                for kind in ['sl', 'tp1', 'tp2']:
+                    self.levels[plan['levels'][kind]]['active'] = True
+            elif new_state == 'tp1':
+                self._retire(plan['levels']['tp1'])
+            for event in events:
+                if event['plan_id'] == plan_id:
+                    event['plan_state'] = plan['state']
+                    event['ambiguous'] = {'sl', 'tp1'} <= kinds or {'sl', 'tp2'} <= kinds
+
+        return events
+
+    def replay(self, stores: Dict[str, BarStore], start=None, end=None) -> Iterator[Dict]:
+        """
+        Feed stored bars through the engine in time order across symbols
+
+        Stands in for a live feed: each bar is delivered exactly as on_bar
+        would receive it from a streaming source.
+        """
+        views = {symbol: store.range(start, end) for symbol, store in stores.items()}
+        symbols = [s for s, v in views.items() if not v.empty]
+        if not symbols:
+            return
+
+        # Merge all symbols into one chronological stream (stable: ties keep symbol order)
+        times = np.concatenate([views[s].index for s in symbols])
+        owners = np.concatenate([np.full(len(views[s]), i) for i, s in enumerate(symbols)])
+        offsets = np.concatenate([np.arange(len(views[s])) for s in symbols])
+        order = np.argsort(times, kind='stable')
+
+        columns = {s: {c: views[s][c] for c in ['open', 'high', 'low', 'close']} for s in symbols}
+        datetimes = {s: views[s].datetimes() for s in symbols}
+        for pos in order:
+            symbol = symbols[owners[pos]]
+            i = offsets[pos]
+            bar = columns[symbol]
+            yield from self.on_bar(symbol, datetimes[symbol][i], float(bar['open'][i]), float(bar['high'][i]),
+                                   float(bar['low'][i]), float(bar['close'][i]))
+
+
+# ==================== Levels file / CLI ====================
+
+def load_levels_file(engine: TriggerEngine, filename: str, data_dir: Path) -> bool:
+    """
+    Load levels and plans from JSON
+
+    Format:
+        {"levels": [{"symbol": "gc1", "low": 4800, "high": 4810, "kind": "custom", "owner": "desk"}],
+         "plans":  [{"symbol": "gc1", "open_price": 4850, "predicted_type": 2, "period": 365, "owner": "desk"}],
+         "strikes": [{"symbol": "gc1", "center": 4850, "range": 200}]}
+
+    Plans given as open_price + predicted_type use the average distances over
+    the last `period` rows of the symbol's daily CSV (default 365), like the
+    period-filtered data daily-plan.js passes to calculateAvgDistanceByType.
+    """
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            spec = json.load(f)
+
+        for item in spec.get('levels', []):
+            engine.add_level(item['symbol'], item['low'], item.get('high'), kind=item.get('kind', 'custom'),
+                             owner=item.get('owner'), once=item.get('once', True))
+
+        daily_cache, avg_cache = {}, {}
+        for item in spec.get('plans', []):
+            symbol = item['symbol']
+            if 'predicted_type' in item:
+                period = int(item.get('period', DEFAULT_PLAN_PERIOD))
+                if symbol not in daily_cache:
+                    daily_cache[symbol] = pd.read_csv(data_dir / DAILY_FILES[symbol])
+                if (symbol, period) not in avg_cache:
+                    avg_cache[(symbol, period)] = avg_distance_by_type(daily_cache[symbol].tail(period))
+                setup = trade_setup(item['open_price'], int(item['predicted_type']), avg_cache[(symbol, period)])
+            else:
+                setup = {key: item[key] for key in ['isBullish', 'entryLow', 'entryHigh', 'sl', 'tp1', 'tp2']}
+            engine.add_plan(symbol, setup, owner=item.get('owner'), label=item.get('label'))
+
+        for item in spec.get('strikes', []):
+            engine.add_strike_grid(item['symbol'], item['center'], item.get('range', 200), owner=item.get('owner'))
+
+        logger.info(f"Loaded {len(engine.levels)} levels and {len(engine.plans)} plans from {filename}")
+        return True
+
+    except Exception as e:
+        logger.error(f"Error loading levels from {filename}: {e}")
+        return False
+
+
+def main():
+    """Replay H1 CSVs through the trigger engine"""
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='Replay H1 bars through the price-level trigger engine')
+    parser.add_argument('--levels', type=str, required=True, help='JSON file with levels, plans and strikes')
+    parser.add_argument('--data-dir', type=str, default=None, help='Directory containing the CSV files')
+    parser.add_argument('--start', type=str, default=None, help='Replay start (Asia/Bangkok if naive)')
+    parser.add_argument('--end', type=str, default=None, help='Replay end (Asia/Bangkok if naive)')
+    parser.add_argument('--output', type=str, default=EVENTS_FILE, help=f'Events CSV (default: {EVENTS_FILE})')
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir) if args.data_dir else Path('.')
+    engine = TriggerEngine()
+    if not load_levels_file(engine, args.levels, data_dir):
+        return
+
+    stores = {}
+    for symbol in engine.indexes:
+        if symbol not in REPLAY_FILES:
+            logger.warning(f"No H1 replay file for {symbol}")
+            continue
+        store = BarStore.from_csv(str(data_dir / REPLAY_FILES[symbol]), source_timezone='UTC')
+        if store is not None:
+            stores[symbol] = store
+
+    events = pd.DataFrame(list(engine.replay(stores, args.start, args.end)))
+    events.to_csv(args.output, index=False, encoding='utf-8')
+    logger.info(f"Replay finished: {len(events)} trigger events saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Volume Profile - Volume-at-Price on the GC 00/25/50/75 Strike Grid
+Per-day histograms of intraday volume, summed into rolling day / week / month
+profiles with POC, value area and high-volume nodes for the CME OI page
+Version 1.0
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# ==================== Configuration ====================
+BIN_SIZE = 25  # 00/25/50/75 strike step (generateGCStrikeGrid in cme-oi.js); strikes are bin centers
+PROFILE_WINDOWS = {'day': 1, 'week': 7, 'month': 30}  # Calendar days ending at the last bar
+VALUE_AREA = 0.70
+TOP_NODES = 10
+VOLUME_DECIMALS = 2
+NS_PER_DAY = 86_400 * 10**9
+
+PROFILE_INPUTS = {
+    'xauusd': {
+        'input_file': 'xauusd_h1_data.csv',
+        'output_file': 'xauusd_volume_profile.json',
+        'cache_file': 'xauusd_volume_profile.npz'
+    },
+    'gc1': {
+        'input_file': 'gc1_h1_data.csv',
+        'output_file': 'gc1_volume_profile.json',
+        'cache_file': 'gc1_volume_profile.npz'
+    }
+}
+# ========================================================
+
+
+def distribute_volume(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+                      step: float = BIN_SIZE) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Spread each bar's volume uniformly over the price bins its range touches
+
+    Bars with no range put all their volume in the bin of the close.
+
+    Returns:
+        (bar index, bin index, volume) for every bar/bin overlap
+    """
+    lo_bin = np.floor(low / step + 0.5).astype(np.int64)
+    hi_bin = np.floor(high / step + 0.5).astype(np.int64)
+    flat = high <= low
+    lo_bin[flat] = hi_bin[flat] = np.floor(close[flat] / step + 0.5).astype(np.int64)
+
+    span = hi_bin - lo_bin + 1
+    bar = np.repeat(np.arange(len(span)), span)
+    offsets = np.repeat(np.cumsum(span) - span, span)
+    bins = lo_bin[bar] + (np.arange(len(bar)) - offsets)
+
+    bar_range = (high - low)[bar]
+    overlap = (np.minimum(high[bar], (bins + 0.5) * step) - np.maximum(low[bar], (bins - 0.5) * step))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        share = np.where(bar_range > 0, np.clip(overlap, 0, None) / bar_range, 1.0)
+    return bar, bins, volume[bar] * share
+
+
+class VolumeProfile:
+    def __init__(self, step: float = BIN_SIZE):
+        """
+        Day-by-bin volume histograms that are updated incrementally
+
+        Each row is one calendar day of the input file's own datetime column.
+        Rows are additive, so any window profile is the sum of its day rows.
+        Updates recompute only days from the last stored day onward, which
+        also absorbs revisions of the last (unfinished) bar.
+
+        Args:
+            step: Price bin size; bin k covers [(k - 0.5) * step, (k + 0.5) * step)
+        """
+        self.step = float(step)
+        self.days = np.array([], dtype=np.int64)
+        self.bin_lo = 0
+        self.hist = np.zeros((0, 0))
+        self.last_time = None
+
+    def update(self, data: pd.DataFrame) -> int:
+        """
+        Add bars (datetime, high, low, close, volume) to the histograms
+
+        Returns:
+            Number of bars binned, or -1 if failed
+        """
+        if data is None or data.empty:
+            logger.error("No data provided for volume profile")
+            return -1
+
+        missing_cols = [col for col in ['datetime', 'high', 'low', 'close', 'volume'] if col not in data.columns]
+        if missing_cols:
+            logger.error(f"Missing required columns for volume profile: {missing_cols}")
+            return -1
+
+        times = pd.DatetimeIndex(pd.to_datetime(data['datetime'])).tz_localize(None).as_unit('ns').asi8
+        day = times // NS_PER_DAY
+
+        # Re-bin from the last stored day so a revised final bar replaces its old volume
+        mask = day >= self.days[-1] if len(self.days) else np.ones(len(day), dtype=bool)
+
+        high = data['high'].to_numpy(float)[mask]
+        low = data['low'].to_numpy(float)[mask]
+        close = data['close'].to_numpy(float)[mask]
+        volume = np.nan_to_num(data['volume'].to_numpy(float)[mask])
+        day = day[mask]
+
+        valid = ~(np.isnan(high) | np.isnan(low) | np.isnan(close))
+        high, low, close, volume, day = high[valid], low[valid], close[valid], volume[valid], day[valid]
+        times = times[mask][valid]
+        if len(day) == 0:
+            return 0
+
+        # Only replace the last stored day when the incoming bars actually cover it
+        if len(self.days) and day.min() == self.days[-1]:
+            self.days, self.hist = self.days[:-1], self.hist[:-1]
+
+        bar, bins, weights = distribute_volume(high, low, close, volume, self.step)
+        new_days, day_row = np.unique(day, return_inverse=True)
+
+        bin_lo = int(bins.min()) if not len(self.days) else min(self.bin_lo, int(bins.min()))
+        bin_hi = max(int(bins.max()), self.bin_lo + self.hist.shape[1] - 1) if len(self.days) else int(bins.max())
+        n_bins = bin_hi - bin_lo + 1
+
+        counts = np.bincount(day_row[bar] * n_bins + (bins - bin_lo), weights=weights,
+                             minlength=len(new_days) * n_bins).reshape(len(new_days), n_bins)
+
+        old = np.zeros((len(self.days), n_bins))
+        if len(self.days):
+            old[:, self.bin_lo - bin_lo:self.bin_lo - bin_lo + self.hist.shape[1]] = self.hist
+
+        self.days = np.concatenate([self.days, new_days])
+        self.hist = np.vstack([old, counts])
+        self.bin_lo = bin_lo
+        self.last_time = int(times.max()) if self.last_time is None else max(self.last_time, int(times.max()))
+        return int(len(day))
+
+    def window(self, days: int, end_day: int = None) -> Tuple[int, np.ndarray]:
+        """
+        Profile of the `days` calendar days ending at end_day (default: last day)
+
+        Returns:
+            (first bin index, volume per bin) with empty bins trimmed at both ends
+        """
+        if not len(self.days):
+            return 0, np.zeros(0)
+        end_day = self.days[-1] if end_day is None else end_day
+        rows = (self.days > end_day - days) & (self.days <= end_day)
+        volume = self.hist[rows].sum(axis=0)
+
+        nonzero = np.flatnonzero(volume > 0)
+        if not len(nonzero):
+            return self.bin_lo, np.zeros(0)
+        return self.bin_lo + int(nonzero[0]), volume[nonzero[0]:nonzero[-1] + 1]
+
+    def save(self, path: str) -> bool:
+        try:
+            np.savez_compressed(path, step=self.step, days=self.days, bin_lo=self.bin_lo, hist=self.hist,
+                                last_time=-1 if self.last_time is None else self.last_time)
+            return True
+        except Exception as e:
+            logger.error(f"Error saving volume profile cache to {path}: {e}")
+            return False
+
+    @classmethod
+    def load(cls, path: str) -> Optional['VolumeProfile']:
+        try:
+            with np.load(path) as cache:
+                profile = cls(float(cache['step']))
+                profile.days = cache['days']
+                profile.bin_lo = int(cache['bin_lo'])
+                profile.hist = cache['hist']
+                profile.last_time = None if int(cache['last_time']) < 0 else int(cache['last_time'])
+            return profile
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable volume profile cache {path}: {e}")
+            return None
+
+
+def profile_summary(bin_lo: int, volume: np.ndarray, step: float = BIN_SIZE,
+                    value_area: float = VALUE_AREA, top_nodes: int = TOP_NODES) -> Dict:
+    """
+    Compact profile arrays plus POC, value area and high-volume nodes
+
+    The value area grows from the POC toward the heavier neighbouring bin
+    until it holds `value_area` of the window's volume. Nodes are local
+    maxima of the histogram, largest first.
+    """
+    total = float(volume.sum())
+    summary = {
+        'priceStart': float(bin_lo * step),
+        'volume': np.round(volume, VOLUME_DECIMALS).tolist(),
+        'total': round(total, VOLUME_DECIMALS)
+    }
+    if total <= 0:
+        return summary
+
+    poc = int(np.argmax(volume))
+    lo = hi = poc
+    covered = volume[poc]
+    while covered < value_area * total and (lo > 0 or hi < len(volume) - 1):
+        below = volume[lo - 1] if lo > 0 else -1.0
+        above = volume[hi + 1] if hi < len(volume) - 1 else -1.0
+        if above >= below:
+            hi += 1
+            covered += above
+        else:
+            lo -= 1
+            covered += below
+
+    padded = np.concatenate([[-np.inf], volume, [-np.inf]])
+    peaks = np.flatnonzero((volume >= padded[:-2]) & (volume > padded[2:]) & (volume > 0))
+    peaks = peaks[np.argsort(volume[peaks])[::-1][:top_nodes]]
+
+    summary.update({
+        'poc': float((bin_lo + poc) * step),
+        'valueAreaLow': float((bin_lo + lo) * step),
+        'valueAreaHigh': float((bin_lo + hi) * step),
+        'nodes': [{'price': float((bin_lo + i) * step),
+                   'volume': round(float(volume[i]), VOLUME_DECIMALS),
+                   'share': round(float(volume[i]) / total, 4)} for i in peaks]
+    })
+    return summary
+
+
+def export_volume_profile(output_dir: str = None, symbols: List[str] = None,
+                          full: bool = False) -> Dict[str, Dict]:
+    """
+    Update the per-day histograms from the H1 CSVs and save window profiles as JSON
+
+    Args:
+        output_dir: Directory containing the H1 CSVs (default: current directory)
+        symbols: Keys from PROFILE_INPUTS (default: all)
+        full: Ignore the cache and rebuild from the CSV alone
+
+    Returns:
+        Dictionary mapping symbol keys to their exported payloads
+    """
+    if symbols is None:
+        symbols = list(PROFILE_INPUTS.keys())
+
+    base_dir = Path(output_dir) if output_dir else Path('.')
+    results = {}
+
+    for symbol_key in symbols:
+        if symbol_key not in PROFILE_INPUTS:
+            logger.error(f"Unknown symbol key: {symbol_key}. Available: {list(PROFILE_INPUTS.keys())}")
+            continue
+
+        config = PROFILE_INPUTS[symbol_key]
+        input_file = base_dir / config['input_file']
+        cache_file = base_dir / config['cache_file']
+        output_file = base_dir / config['output_file']
+        if not input_file.exists():
+            logger.warning(f"Input file not found: {input_file}")
+            continue
+
+        try:
+            profile = None
+            if not full and cache_file.exists():
+                profile = VolumeProfile.load(str(cache_file))
+                if profile is not None and profile.step != float(BIN_SIZE):
+                    profile = None
+            if profile is None:
+                profile = VolumeProfile()
+
+            binned = profile.update(pd.read_csv(input_file))
+            if binned < 0 or not len(profile.days):
+                continue
+            profile.save(str(cache_file))
+
+            payload = {
+                'symbol': symbol_key,
+                'step': profile.step,
+                'asOf': pd.Timestamp(profile.last_time).strftime('%Y-%m-%d %H:%M:%S'),
+                'windows': {}
+            }
+            for name, days in PROFILE_WINDOWS.items():
+                bin_lo, volume = profile.window(days)
+                payload['windows'][name] = {'days': days, **profile_summary(bin_lo, volume, profile.step)}
+
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, separators=(',', ':'))
+
+            week = payload['windows'].get('week', {})
+            logger.info(f"Volume profile saved to {output_file} ({binned} bars binned, "
+                        f"week POC: {week.get('poc')})")
+            results[symbol_key] = payload
+
+        except Exception as e:
+            logger.error(f"Error building volume profile for {symbol_key}: {e}")
+
+    return results
+
+
+def main():
+    """Build volume-at-price profiles from the H1 pipeline CSVs"""
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description='Bin H1 volume into strike-grid volume profiles')
+    parser.add_argument('--symbols', nargs='+', choices=list(PROFILE_INPUTS.keys()) + ['all'],
+                        default=['all'], help='Symbols to process (default: all)')
+    parser.add_argument('--output-dir', type=str, default=None,
+                        help='Directory containing the H1 CSV files')
+    parser.add_argument('--full', action='store_true',
+                        help='Rebuild from the CSV instead of updating the cached histograms')
+    args = parser.parse_args()
+
+    symbols = list(PROFILE_INPUTS.keys()) if 'all' in args.symbols else args.symbols
+    export_volume_profile(output_dir=args.output_dir, symbols=symbols, full=args.full)
+
+
+if __name__ == "__main__":
+    main()